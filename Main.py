@@ -1,24 +1,72 @@
+import argparse
+import os
+import time
+_START = time.perf_counter()  # Bezugspunkt für den Startbericht
 import pygame
+from module import persistence
 from module.Gamemodule import Game2048
+from module.asyncai import AsyncPlayer, CheckpointWriter
 from module.const import GameConfig
+from module.expectimax import ExpectimaxAI
+from module.montecarlo import MonteCarloAI
+from module.profiler import FrameProfiler
+from module.recording import GameRecorder, RecordingWriter
+
+IDLE_WAIT_MS = 1000  # Maximale Wartezeit auf ein Event, wenn nichts animiert wird
+MAX_FRAME_TIME = 0.05  # Obergrenze für dt nach einer Leerlaufphase
+FAST_STEP_BUDGET = 0.015  # Schnelldurchlauf: Rechenzeit für Bot-Züge pro Frame in Sekunden
+FAST_RENDER_EVERY = 10    # Schnelldurchlauf: nur jeden N-ten Frame zeichnen
+FAST_SAVE_EVERY = 25      # Schnelldurchlauf: Modell nur alle K Spiele speichern
+PROFILE_TRACE_PATH = os.path.join("app_data", "profile_trace")  # Ziel des Exports (.csv und .json)
+
 
 class GameMain(GameConfig):
-    def __init__(self):
-        super().__init__()  # Initialisiere GameConfig
+    def __init__(self, grid_size=4):
+        super().__init__(grid_size)  # Initialisiere GameConfig (Schriften werden erst beim ersten Zeichnen geladen)
+        self._startup = [("Import", time.perf_counter())]
         pygame.init()
         self.screen = pygame.display.set_mode(self.WINDOW_SIZE)
         pygame.display.set_caption("2048")
-        self.game = Game2048()
+        # Das Aufzeichnungsformat kennt nur 4x4-Positionen
+        self.recording = RecordingWriter(self.RECORDING_PATH) if self.RECORD_GAMES and grid_size == 4 else None
+        # Das Spiel nutzt diese Konfiguration mit, statt eine eigene aufzubauen; die KI lädt erst nach dem ersten Frame
+        self.game = Game2048(recorder=GameRecorder(self.recording) if self.recording else None, grid_size=grid_size, config=self)
+        self._startup.append(("Init", time.perf_counter()))
         self.clock = pygame.time.Clock()
         self.running = True
         self.autoplay = False      # Autoplay standardmäßig deaktiviert
         self.ai_play = False       # KI-Modus deaktiviert
+        self.expectimax_play = False  # Expectimax-Suche deaktiviert
+        self.expectimax = None     # Wird beim ersten Einschalten erstellt (rechnet im Hintergrund-Thread)
+        self.montecarlo_play = False  # Monte-Carlo-Rollouts deaktiviert
+        self.montecarlo = None     # Prozesspool wird erst beim ersten Einschalten gestartet
         self.show_stats = False    # Debug-Overlay standardmäßig ausgeblendet
+        self.fast_forward = False  # Schnelldurchlauf ohne Animationen
+        self.frame = 0
+        self.unsaved_games = 0     # Im Schnelldurchlauf beendete, noch nicht gespeicherte Spiele
+        self.moves_per_sec = 0.0
+        self._rate_mark = (time.perf_counter(), 0)  # (Zeitpunkt, Zugzähler) der letzten Messung
+        self._stats_overlay = (None, None)  # (Zeilen, Surface) des zuletzt gezeichneten Debug-Overlays
+        self.profiler = FrameProfiler()  # Phasen-Messung, mit 'P' ein- und ausschalten
+        self.checkpoints = CheckpointWriter()  # Modell-Checkpoints werden im Hintergrund geschrieben
+        self.game.checkpoints = self.checkpoints  # Auch verdrängte Q-Tabellen-Einträge (nicht im Render-Thread)
+
+    def handle_events(self, idle=False):
+        """Verarbeitet alle Events; im Leerlauf wird blockierend auf das nächste Event gewartet."""
+        events = pygame.event.get()
+        if idle and not events:
+            event = pygame.event.wait(IDLE_WAIT_MS)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+        with self.profiler.phase("events"):
+            self.process_events(events)
 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def process_events(self, events):
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.game.invalidate()  # Fensterinhalt ging verloren
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
                     self.game.move(0)
@@ -36,60 +84,206 @@ class GameMain(GameConfig):
                     self.autoplay = not self.autoplay
                 elif event.key == pygame.K_i:
                     self.ai_play = not self.ai_play
+                elif event.key in (pygame.K_e, pygame.K_m) and self.GRID_SIZE != 4:
+                    print("⚠️ Expectimax und Monte Carlo rechnen auf dem Bitboard und gibt es nur für 4x4")
+                elif event.key == pygame.K_e:
+                    if self.expectimax is None:
+                        self.expectimax = AsyncPlayer(ExpectimaxAI())
+                    self.expectimax_play = not self.expectimax_play
+                    self.expectimax.cancel()
+                elif event.key == pygame.K_m:
+                    if self.montecarlo is None:
+                        self.montecarlo = AsyncPlayer(MonteCarloAI())
+                    self.montecarlo_play = not self.montecarlo_play
+                    self.montecarlo.cancel()
                 elif event.key == pygame.K_d:
                     self.show_stats = not self.show_stats  # Toggle Debug-Informationen
+                elif event.key == pygame.K_f:
+                    self.fast_forward = not self.fast_forward
+                    if not self.fast_forward:
+                        self.save_pending_games()
+                elif event.key == pygame.K_p:
+                    self.toggle_profiler()
+
+    def report_startup(self):
+        """Gibt die Startzeiten bis zum ersten Frame aus und lädt danach die KI im Hintergrund."""
+        self._startup.append(("Erster Frame", time.perf_counter()))
+        last = _START
+        parts = []
+        for name, mark in self._startup:
+            parts.append(f"{name} {(mark - last) * 1e3:.0f} ms")
+            last = mark
+        print(f"🚀 Erster Frame nach {(last - _START) * 1e3:.0f} ms ({', '.join(parts)})")
+        self.game.preload_ai()
+
+    def toggle_profiler(self):
+        """Schaltet die Messung ein bzw. aus; beim Ausschalten wird der Trace exportiert."""
+        if self.profiler.toggle():
+            print("⏱️ Profiler aktiviert")
+            return
+        if self.profiler.trace:
+            os.makedirs("app_data", exist_ok=True)
+            csv_path, json_path = self.profiler.export(PROFILE_TRACE_PATH)
+            print(f"💾 Profiler-Trace gespeichert als {csv_path} und {json_path}")
+
+    def draw_stats(self, font, text_color):
+        """Liefert das Debug-Overlay mit Modell- und Laufzeitstatistiken (neu gerendert nur bei Änderungen)."""
+        lines = [
+            f"Modell-Version: {self.game.ai.version}",
+            f"Best Score: {self.game.ai.best_score}",
+            f"Spiele: {self.game.ai.games_played}",
+        ]
+        q_table = getattr(self.game.ai, 'q_table', None)
+        if q_table is not None:
+            stats = q_table.stats()
+            lines.append(f"Q-Tabelle: {stats['entries']} ({stats['in_memory']} im RAM)")
+            lines.append(f"Treffer: {stats['hit_rate']:.0%}  Verdrängt: {stats['evictions']}")
+        if self.montecarlo:
+            lines.append(f"Rollouts/s: {self.montecarlo.rollouts_per_sec:.0f}")
+        if self.fast_forward:
+            lines.append(f"Schnelldurchlauf: {self.moves_per_sec:.0f} Züge/s")
+        if self.profiler.enabled:
+            lines.extend(self.profiler.report_lines())
+
+        if self._stats_overlay[0] == lines:
+            return self._stats_overlay[1]
+        texts = [font.render(line, True, text_color) for line in lines]
+        overlay = pygame.Surface((max([320] + [text.get_width() + 10 for text in texts]), 5 + 25 * len(lines)))
+        overlay.fill((0, 0, 0))
+        for n, text in enumerate(texts):
+            overlay.blit(text, (5, 5 + 25 * n))
+        overlay.set_alpha(150)
+        self._stats_overlay = (lines, overlay)
+        return overlay
+
+    def finish_ai_game(self, save=True):
+        """Übernimmt die Statistiken eines beendeten KI-Spiels, speichert (optional) und startet neu."""
+        self.game.ai.games_played += 1
+        if self.game.score > self.game.ai.best_score:
+            self.game.ai.best_score = self.game.score
+        if self.game.best_tile > self.game.ai.best_tile:
+            self.game.ai.best_tile = self.game.best_tile
+
+        if save:
+            with self.profiler.phase("save"):
+                self.game.ai.save_model(self.checkpoints)  # Nur einmal speichern (schreibt im Hintergrund)
+            self.unsaved_games = 0
+        else:
+            self.unsaved_games += 1
+        self.game.reset_game()  # Nur hier resetten!
+
+    def save_pending_games(self):
+        """Speichert das Modell, falls im Schnelldurchlauf Spiele ungespeichert geblieben sind."""
+        if self.unsaved_games:
+            with self.profiler.phase("save"):
+                self.game.ai.save_model(self.checkpoints)
+            self.unsaved_games = 0
+
+    def bot_step(self, instant=False):
+        """
+        Lässt alle aktiven Bots einen Zug machen. Die Suchen (Expectimax, Monte-Carlo) rechnen im
+        Hintergrund und ziehen erst, wenn ihr Ergebnis vorliegt; im Schnelldurchlauf wird darauf gewartet.
+        """
+        if self.autoplay and not self.game.game_over:
+            self.game.auto_move(instant)
+        if self.ai_play and not self.game.game_over:
+            self.game.auto_ai_move(instant)
+        for player, active in ((self.expectimax, self.expectimax_play), (self.montecarlo, self.montecarlo_play)):
+            if active and not self.game.game_over:
+                if instant:
+                    self.game.auto_player_move(player, instant)
+                else:
+                    player.step(self.game)
+
+    def run_fast_forward(self):
+        """Schnelldurchlauf: Bot-Züge ohne Animation, bis das Zeitbudget dieses Frames verbraucht ist."""
+        deadline = time.perf_counter() + FAST_STEP_BUDGET
+        self.game.finish_animations()
+        while time.perf_counter() < deadline:
+            if self.game.game_won and not self.game.continue_after_win:
+                self.game.continue_game()  # Nicht am Win-Bildschirm hängen bleiben
+            if self.game.game_over:
+                if not self.ai_play:
+                    break
+                self.finish_ai_game(save=self.unsaved_games + 1 >= FAST_SAVE_EVERY)
+                continue
+            self.bot_step(instant=True)
+
+        now = time.perf_counter()
+        since, moves = self._rate_mark
+        if now - since >= 1.0:
+            self.moves_per_sec = (self.game.total_moves - moves) / (now - since)
+            self._rate_mark = (now, self.game.total_moves)
+
+    def render(self):
+        """Zeichnet Spielfeld und HUD und gibt die geänderten Bereiche an das Display weiter."""
+        tiles = self.game.tiles
+        text_color = self.game.config.TEXT_COLOR_BRIGHT
+        hud = [
+            (tiles.text('extra_small', "'A' für Autoplay", text_color), (10, self.game.config.WINDOW_HEIGHT - 70)),
+            (tiles.text('extra_small', "'I' für Intelligent Mode", text_color), (270, self.game.config.WINDOW_HEIGHT - 70)),
+        ]
+        if self.show_stats:
+            hud.append((self.draw_stats(self.game.config.font['extra_small'], text_color), (10, 10)))
+
+        # Nur geänderte Bereiche an das Display übergeben
+        with self.profiler.phase("draw"):
+            dirty = self.game.draw(self.screen, hud)
+        if dirty:
+            with self.profiler.phase("display"):
+                pygame.display.update(dirty)
 
     def run(self):
         while self.running:
-            dt = self.clock.tick(60) / 1000  
-            self.handle_events()
+            bot_active = self.autoplay or self.ai_play or self.expectimax_play or self.montecarlo_play
+            fast = self.fast_forward and bot_active
+            # Leerlauf: keine Animation und kein Bot am Zug – dann bis zum nächsten Event schlafen
+            bot_pending = bot_active and (not self.game.game_over or self.ai_play)
+            idle = not self.game.is_animating() and not bot_pending
+            self.handle_events(idle)
+            # Im Schnelldurchlauf begrenzt das Zeitbudget die Frames, nicht clock.tick
+            dt = min((self.clock.tick() if fast else self.clock.tick(60)) / 1000, MAX_FRAME_TIME)
+            self.frame += 1
 
-            dt_effective = dt * 3 if not self.autoplay and not self.ai_play else dt
+            dt_effective = dt * 3 if not bot_active else dt
 
-            if self.autoplay and not self.game.game_over:
-                self.game.auto_move()
-            if self.ai_play and not self.game.game_over:
-                self.game.auto_ai_move()
+            with self.profiler.phase("ai"):
+                if fast:
+                    self.run_fast_forward()
+                else:
+                    self.bot_step()
 
-            if self.game.game_over:
-                if self.ai_play:  # Nur wenn AI aktiv ist, soll das Spiel neu starten
-                    self.game.ai.games_played += 1
-                    if self.game.score > self.game.ai.best_score:
-                        self.game.ai.best_score = self.game.score
-                    if self.game.best_tile > self.game.ai.best_tile:
-                        self.game.ai.best_tile = self.game.best_tile
-
-                    self.game.ai.save_model()  # Nur einmal speichern
-                    self.game.reset_game()  # Nur hier resetten!
-
-            self.game.update(dt_effective)
-            self.game.draw(self.screen)
-
-            font_small = self.game.config.font['extra_small']
-            text_color = self.game.config.TEXT_COLOR_BRIGHT
-            autoplay_text = font_small.render("'A' für Autoplay", True, text_color)
-            ai_text = font_small.render("'I' für Intelligent Mode", True, text_color)
-            self.screen.blit(autoplay_text, (10, self.game.config.WINDOW_HEIGHT - 70))
-            self.screen.blit(ai_text, (270, self.game.config.WINDOW_HEIGHT - 70))
-
-            if self.show_stats:
-                overlay_rect = pygame.Rect(10, 10, 250, 80)
-                overlay = pygame.Surface((overlay_rect.width, overlay_rect.height))
-                overlay.set_alpha(150)
-                overlay.fill((0, 0, 0))
-                self.screen.blit(overlay, (overlay_rect.x, overlay_rect.y))
-
-                version_text = font_small.render(f"Modell-Version: {self.game.ai.version}", True, text_color)
-                best_score_text = font_small.render(f"Best Score: {self.game.ai.best_score}", True, text_color)
-                games_played_text = font_small.render(f"Spiele: {self.game.ai.games_played}", True, text_color)
-                self.screen.blit(version_text, (overlay_rect.x + 5, overlay_rect.y + 5))
-                self.screen.blit(best_score_text, (overlay_rect.x + 5, overlay_rect.y + 30))
-                self.screen.blit(games_played_text, (overlay_rect.x + 5, overlay_rect.y + 55))
-
-            pygame.display.flip()
+            if self.game.game_over and self.ai_play:  # Nur wenn AI aktiv ist, soll das Spiel neu starten
+                self.finish_ai_game()
+
+            with self.profiler.phase("update"):
+                self.game.update(dt_effective)
+            if not fast or self.frame % FAST_RENDER_EVERY == 0:  # Im Schnelldurchlauf nur jeden N-ten Frame zeichnen
+                self.render()
+                if self.frame == 1:
+                    self.report_startup()
+
+            if self.profiler.enabled:
+                self.profiler.gauge("moves", self.game.total_moves)
+                q_table = getattr(self.game.ai, 'q_table', None)
+                if q_table is not None:
+                    self.profiler.gauge("q_table", len(q_table))
+            self.profiler.end_frame()
 
+        self.save_pending_games()
+        self.checkpoints.close()  # Ausstehende Checkpoints noch schreiben
+        persistence.store.close()  # Highscore und Modellinfos schreiben
+        if self.recording:
+            self.game.recorder.end_game()  # Laufendes Spiel mit aufnehmen
+            self.recording.close()
+        if self.expectimax:
+            self.expectimax.close()
+        if self.montecarlo:
+            self.montecarlo.close()
         pygame.quit()
 
 
 if __name__ == "__main__":
-    GameMain().run()
+    parser = argparse.ArgumentParser(description="2048")
+    parser.add_argument("--size", type=int, default=4, choices=range(4, 9), help="Feldgröße (4 bis 8)")
+    GameMain(parser.parse_args().size).run()
@@ -1,18 +1,53 @@
 import pygame
 import random
 import os
-from module.const import GameConfig
+import threading
+import time
+from collections import deque
+from module.const import shared_config
+from module import persistence
 from module.ai import AI2048
+from module.ntuple import NTupleAI
+from module.tilecache import TileCache
+from module import engine, bitboard
+
+def merge_rects(rects, bounds):
+    """Fasst sich überlappende Rechtecke zusammen und beschneidet sie auf `bounds`."""
+    merged = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.width or not rect.height:
+            continue
+        # Solange das Rechteck ein bereits gesammeltes berührt, beide vereinigen
+        hit = rect.collidelist(merged)
+        while hit != -1:
+            rect.union_ip(merged.pop(hit))
+            hit = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
 
 class Game2048:
-    def __init__(self):
-        self.config = GameConfig()  # Konfiguration des Spiels
+    def __init__(self, recorder=None, grid_size=4, config=None):
+        self.config = config if config is not None else shared_config(grid_size)  # Konfiguration des Spiels (geteilt)
+        self.recorder = recorder  # Optionaler GameRecorder (Aufzeichnung aller Züge und Spawns)
+        self.forced_spawns = deque()  # Vorgegebene Spawns (Position, Wert), z.B. bei der Wiedergabe
+        self.seed = random.getrandbits(64)  # Seed des Spawn-Zufalls, wird mit aufgezeichnet
+        self.rng = random.Random(self.seed)
+        self.tiles = TileCache(self.config)  # Vorgerenderte Kacheln für draw()
         # Logisches Raster: Zahl in jeder Zelle
         self.grid = [[0 for _ in range(self.config.GRID_SIZE)] for _ in range(self.config.GRID_SIZE)]
+        # Laufend gepflegte Brett-Metadaten (statt Scans nach jedem Zug)
+        self.full_mask = (1 << (self.config.GRID_SIZE * self.config.GRID_SIZE)) - 1
+        self.empty_mask = self.full_mask  # Bit i*GRID_SIZE+j gesetzt = Zelle (i, j) leer
+        self._mergeable = None  # Gibt es benachbarte gleiche Kacheln? None = noch nicht geprüft
+        self._afterstates = None  # Ergebnisse aller vier Züge für das aktuelle Brett (siehe afterstates)
         self.score = 0
-        self.high_score_path = os.path.join("app_data", "highscore.txt")
+        size = self.config.GRID_SIZE
+        self.high_score_path = os.path.join("app_data", "highscore.txt" if size == 4 else f"highscore_{size}x{size}.txt")
         self.high_score = self._load_high_score()
         self.best_tile = 0  # Höchster Wert, der erreicht wurde
+        self.total_moves = 0  # Ausgeführte Züge über alle Spiele (für Züge/s im Schnelldurchlauf)
         self.game_over = False
         self.game_won = False
         self.continue_after_win = False
@@ -23,259 +58,283 @@ class Game2048:
         self.moving = False
         self.move_anim_progress = 0
         self.new_grid = None
+        self.new_occupied = 0  # Belegte Zellen von new_grid als Bitmaske
         
         # Merges für Merge-Animation
         self.merges = []
         self.merge_scale = 1.0
         self.merge_phase = 0  # 0: nicht aktiv, 1: wachsen, 2: schrumpfen
+
+        # Zeichenliste des letzten Frames für das Neuzeichnen geänderter Bereiche (None = alles)
+        self._last_scene = None
         
         # Zu Beginn zwei zufällige Kacheln
+        if self.recorder is not None:
+            self.recorder.start(self.seed)
         self.add_new_tile()
         self.add_new_tile()
         
-        # AI
-        self.ai = AI2048()
-        self.ai.load_model()
-        
+        # AI: wird erst beim ersten Zugriff erstellt (oder per preload_ai im Hintergrund)
+        self._ai = None
+        self._ai_lock = threading.Lock()
+        self.checkpoints = None  # Optionaler CheckpointWriter für Schreibvorgänge der KI (siehe Main)
+
+    def _create_ai(self):
+        """Erstellt die lernende KI und lädt ihr Modell (das N-Tupel-Netz ist auf 4x4-Bitboards festgelegt)."""
+        cfg = self.config
+        if cfg.AI_MODEL == "ntuple" and cfg.GRID_SIZE == 4:
+            return NTupleAI(replay_capacity=cfg.REPLAY_CAPACITY, batch_size=cfg.REPLAY_BATCH_SIZE)  # Lädt das Modell selbst
+        return AI2048(max_entries=cfg.Q_TABLE_MAX_ENTRIES, eviction=cfg.Q_TABLE_EVICTION,
+                      replay_capacity=cfg.REPLAY_CAPACITY, batch_size=cfg.REPLAY_BATCH_SIZE, grid_size=cfg.GRID_SIZE,
+                      writer=self.checkpoints)
+
+    @property
+    def ai(self):
+        """Die lernende KI; beim ersten Zugriff wird das Modell geladen (bzw. auf das Vorladen gewartet)."""
+        if self._ai is None:
+            with self._ai_lock:
+                if self._ai is None:
+                    self._ai = self._create_ai()
+        return self._ai
+
+    @ai.setter
+    def ai(self, ai):
+        self._ai = ai
+
+    def preload_ai(self):
+        """Lädt das Modell in einem Hintergrund-Thread, damit der erste Frame nicht darauf wartet."""
+        if self._ai is not None:
+            return
+
+        def load():
+            start = time.perf_counter()
+            self.ai
+            print(f"🧠 KI im Hintergrund geladen ({(time.perf_counter() - start) * 1e3:.0f} ms)")
+        threading.Thread(target=load, name="ai-preload", daemon=True).start()
+
     def _load_high_score(self):
         """Lädt den Highscore aus der Datei app_data/highscore.txt oder gibt 0 zurück, falls nicht vorhanden."""
         try:
-            with open(self.high_score_path, "r") as f:
-                return int(f.read().strip())
-        except (FileNotFoundError, ValueError):
+            return int((persistence.store.read(self.high_score_path) or "").strip())
+        except ValueError:
             return 0
 
     def _save_high_score(self):
-        """Speichert den aktuellen Highscore in der Datei app_data/highscore.txt."""
-        os.makedirs("app_data", exist_ok=True)  # Falls app_data nicht existiert, erstelle es
-        with open(self.high_score_path, "w") as f:
-            f.write(str(self.high_score))
-
-    def add_new_tile(self):
-        """Fügt an einer leeren Stelle eine 2 oder 4 hinzu und startet den Spawn-Effekt."""
-        empty_cells = [(i, j) for i in range(self.config.GRID_SIZE) for j in range(self.config.GRID_SIZE) if self.grid[i][j] == 0]
-        if empty_cells:
-            i, j = random.choice(empty_cells)
-            value = 2 if random.random() < 0.9 else 4
-            self.grid[i][j] = value
+        """Merkt den Highscore zum Speichern vor; geschrieben wird verzögert bzw. am Spielende."""
+        persistence.store.put(self.high_score_path, str(self.high_score))
+
+    def add_new_tile(self, animate=True):
+        """Fügt an einer leeren Stelle eine 2 oder 4 hinzu und startet (optional) den Spawn-Effekt."""
+        size = self.config.GRID_SIZE
+        if self.forced_spawns:
+            pos, value = self.forced_spawns.popleft()
+        else:
+            # Leere Zellen aus der Bitmaske (O(Anzahl leerer Zellen), Reihenfolge wie zeilenweise)
+            mask = self.empty_mask
+            if not mask:
+                return
+            empty_cells = []
+            while mask:
+                low = mask & -mask
+                empty_cells.append(low.bit_length() - 1)
+                mask ^= low
+            pos = self.rng.choice(empty_cells)
+            value = 2 if self.rng.random() < 0.9 else 4
+        i, j = divmod(pos, size)
+        self.empty_mask &= ~(1 << pos)
+        self._mergeable = None
+        self._afterstates = None
+        self.grid[i][j] = value
+        if self.recorder is not None:
+            self.recorder.spawn(i, j, value)
+        if animate:
             self.spawn_animations[(i, j)] = 0  # Startet Spawn-Animation
-            
-            # Aktualisiere best_tile wenn nötig
-            if value > self.best_tile:
-                self.best_tile = value
+
+        # Aktualisiere best_tile wenn nötig
+        if value > self.best_tile:
+            self.best_tile = value
 
     def process_line(self, line):
         """
         Verarbeitet eine Zeile oder Spalte (als Liste von Zahlen).
-        Gibt (neue Linie, animations_info, Punkte) zurück.
+        Gibt (neue Linie, animations_info, Punkte, Merge-Positionen) zurück.
         """
-        non_zero = [(val, idx) for idx, val in enumerate(line) if val != 0]
-        new_line = []
-        anims = []
-        points = 0
-        merge_positions = []  # Für Merge-Animationen
-        
-        i = 0
-        while i < len(non_zero):
-            if i < len(non_zero) - 1 and non_zero[i][0] == non_zero[i+1][0]:
-                merged_value = non_zero[i][0] * 2
-                points += merged_value
-                new_line.append(merged_value)
-                target_index = len(new_line) - 1
-                
-                # Bei einem Merge beide Kacheln zum Ziel bewegen
-                anims.append({'value': non_zero[i][0], 'start_index': non_zero[i][1], 
-                             'end_index': target_index, 'merge': True})
-                anims.append({'value': non_zero[i+1][0], 'start_index': non_zero[i+1][1], 
-                             'end_index': target_index, 'merge': True})
-                
-                # Speichere Position für Merge-Animation
-                merge_positions.append(target_index)
-                
-                # Aktualisiere best_tile wenn nötig
-                if merged_value > self.best_tile:
-                    self.best_tile = merged_value
-                
-                i += 2
-            else:
-                new_line.append(non_zero[i][0])
-                target_index = len(new_line) - 1
-                anims.append({'value': non_zero[i][0], 'start_index': non_zero[i][1], 
-                             'end_index': target_index, 'merge': False})
-                i += 1
-                
-        # Fülle mit Nullen auf
-        while len(new_line) < self.config.GRID_SIZE:
-            new_line.append(0)
-            
-        return new_line, anims, points, merge_positions
+        new_line, points, merge_positions, slides = engine.line_move(line)
+        anims = [{'value': line[start], 'start_index': start, 'end_index': end, 'merge': merge}
+                 for start, end, merge in slides]
+
+        # Aktualisiere best_tile wenn nötig
+        for pos in merge_positions:
+            if new_line[pos] > self.best_tile:
+                self.best_tile = new_line[pos]
+
+        return list(new_line), anims, points, list(merge_positions)
 
     def compute_move(self, direction):
         """
         Berechnet das neue Raster und erstellt Animationsdaten für den Zug.
         direction: 0=Up, 1=Right, 2=Down, 3=Left
+        Jede Zeile/Spalte ist ein Nachschlagen in der Linientabelle der Engine.
+        Gibt (Raster, Animationen, Punkte, moved, Merges, belegte Zellen als Bitmaske) zurück.
         """
-        moved = False
+        size = self.config.GRID_SIZE
+        last = size - 1
+        horizontal = direction in (3, 1)  # Horizontal (Left:3, Right:1)
+        reverse = direction in (1, 2)     # Rechts/Runter: Linie gespiegelt nachschlagen
         total_points = 0
-        new_grid = [[0 for _ in range(self.config.GRID_SIZE)] for _ in range(self.config.GRID_SIZE)]
+        new_grid = [[0 for _ in range(size)] for _ in range(size)]
         animations = []
         merges = []  # Liste aller Merge-Positionen (row, col)
+        occupied = 0  # Belegte Zellen nach dem Zug
+        spread = engine.column_spread(size)
+
+        for k in range(size):
+            line = self.grid[k] if horizontal else [self.grid[i][k] for i in range(size)]
+            if reverse:
+                line = line[::-1]
+            entry = engine.line_move(line)
+            new_line, pts, merge_pos, slides = entry
+            total_points += pts
+            bits = engine.line_occupancy(entry, size, reverse)
+            occupied |= bits << (k * size) if horizontal else spread[bits] << k
+
+            for idx, value in enumerate(new_line):
+                pos = last - idx if reverse else idx
+                if horizontal:
+                    new_grid[k][pos] = value
+                else:
+                    new_grid[pos][k] = value
+            for pos in merge_pos:
+                # Aktualisiere best_tile wenn nötig
+                if new_line[pos] > self.best_tile:
+                    self.best_tile = new_line[pos]
+                pos = last - pos if reverse else pos
+                merges.append((k, pos) if horizontal else (pos, k))
+
+            # Animationsdaten aus den (Start, Ziel)-Paaren der Tabelle
+            for start, end, merge in slides:
+                anim = {
+                    'value': line[start],
+                    'horizontal': horizontal,
+                    'start_idx': last - start if reverse else start,
+                    'end_idx': last - end if reverse else end,
+                    'merge': merge,
+                }
+                anim['row' if horizontal else 'col'] = k
+                animations.append(anim)
 
-        # Hilfsfunktion zum Vergleich zweier Zeilen
-        def different(line1, line2):
-            return any(a != b for a, b in zip(line1, line2))
-
-        if direction in (3, 1):  # Horizontal (Left:3, Right:1)
-            for i in range(self.config.GRID_SIZE):
-                row = self.grid[i][:]
-                if direction == 1:  # Rechts
-                    row_rev = row[::-1]
-                    new_line, anims, pts, merge_pos = self.process_line(row_rev)
-                    new_line = new_line[::-1]
-                    
-                    # Konvertiere Merge-Positionen für rechte Richtung
-                    row_merges = [(i, self.config.GRID_SIZE - 1 - pos) for pos in merge_pos]
-                    merges.extend(row_merges)
-                    
-                    total_points += pts
-                    if different(row, new_line):
-                        moved = True
-                    new_grid[i] = new_line
-                    
-                    # Passe Animationsdaten an
-                    for anim in anims:
-                        orig = self.config.GRID_SIZE - 1 - anim['start_index']
-                        target = self.config.GRID_SIZE - 1 - anim['end_index']
-                        animations.append({
-                            'value': anim['value'],
-                            'horizontal': True,
-                            'row': i,
-                            'start_idx': orig,
-                            'end_idx': target,
-                            'merge': anim['merge']
-                        })
-                else:  # Links
-                    new_line, anims, pts, merge_pos = self.process_line(row)
-                    
-                    # Speichere Merge-Positionen
-                    row_merges = [(i, pos) for pos in merge_pos]
-                    merges.extend(row_merges)
-                    
-                    total_points += pts
-                    if different(row, new_line):
-                        moved = True
-                    new_grid[i] = new_line
-                    
-                    for anim in anims:
-                        animations.append({
-                            'value': anim['value'],
-                            'horizontal': True,
-                            'row': i,
-                            'start_idx': anim['start_index'],
-                            'end_idx': anim['end_index'],
-                            'merge': anim['merge']
-                        })
-        else:  # Vertikal (Up:0, Down:2)
-            for j in range(self.config.GRID_SIZE):
-                col = [self.grid[i][j] for i in range(self.config.GRID_SIZE)]
-                if direction == 2:  # Runter
-                    col_rev = col[::-1]
-                    new_col, anims, pts, merge_pos = self.process_line(col_rev)
-                    new_col = new_col[::-1]
-                    
-                    # Konvertiere Merge-Positionen für Abwärtsbewegung
-                    col_merges = [(self.config.GRID_SIZE - 1 - pos, j) for pos in merge_pos]
-                    merges.extend(col_merges)
-                    
-                    total_points += pts
-                    if different(col, new_col):
-                        moved = True
-                    for i in range(self.config.GRID_SIZE):
-                        new_grid[i][j] = new_col[i]
-                        
-                    for anim in anims:
-                        orig = self.config.GRID_SIZE - 1 - anim['start_index']
-                        target = self.config.GRID_SIZE - 1 - anim['end_index']
-                        animations.append({
-                            'value': anim['value'],
-                            'horizontal': False,
-                            'col': j,
-                            'start_idx': orig,
-                            'end_idx': target,
-                            'merge': anim['merge']
-                        })
-                else:  # Hoch
-                    new_col, anims, pts, merge_pos = self.process_line(col)
-                    
-                    # Speichere Merge-Positionen
-                    col_merges = [(pos, j) for pos in merge_pos]
-                    merges.extend(col_merges)
-                    
-                    total_points += pts
-                    if different(col, new_col):
-                        moved = True
-                    for i in range(self.config.GRID_SIZE):
-                        new_grid[i][j] = new_col[i]
-                        
-                    for anim in anims:
-                        animations.append({
-                            'value': anim['value'],
-                            'horizontal': False,
-                            'col': j,
-                            'start_idx': anim['start_index'],
-                            'end_idx': anim['end_index'],
-                            'merge': anim['merge']
-                        })
-                        
-        return new_grid, animations, total_points, moved, merges
-
-    def move(self, direction):
+        moved = new_grid != self.grid
+        return new_grid, animations, total_points, moved, merges, occupied
+
+    def move(self, direction, instant=False):
         """
         Löst einen Zug aus – berechnet neue Positionen und startet die Bewegungsanimation.
         direction: 0=Up, 1=Right, 2=Down, 3=Left
+        instant: Zug ohne Animationen sofort ausführen (Schnelldurchlauf beim Training)
         """
         if self.moving or (self.game_over and not self.game_won) or (self.game_won and not self.continue_after_win):
             return False
+        if self.merge_phase > 0:
+            # Neue Kachel des vorigen Zuges erst setzen, sonst überschreibt der neue Zug sie
+            self._finish_merge()
+            if self.game_over or (self.game_won and not self.continue_after_win):
+                return False
+
+        cached = self._afterstates
+        if cached is not None and not cached[direction][2]:
+            return False  # Schon bei der Entscheidung als ungültig erkannt
+
+        if instant:
+            if cached is not None:  # Von der KI bereits berechneter Afterstate wird übernommen
+                new_grid, pts, moved = cached[direction]
+                occupied = engine.occupancy(new_grid)
+            else:
+                new_grid, pts, moved, occupied = engine.move_grid(self.grid, direction, occupied=True)
+            if moved:
+                if self.recorder is not None:
+                    self.recorder.move(direction)
+                self._set_grid(new_grid, occupied)
+                if pts > self.best_tile:  # Nur dann kann eine größere Kachel entstanden sein
+                    self.best_tile = max(self.best_tile, engine.max_tile(new_grid))
+                self._add_points(pts)
+                self.add_new_tile(animate=False)
+                self.check_win()
+                if self.is_game_over():
+                    self.game_over = True
+            return moved
 
-        new_grid, anims, pts, moved, merges = self.compute_move(direction)
+        new_grid, anims, pts, moved, merges, occupied = self.compute_move(direction)
         if moved:
+            if self.recorder is not None:
+                self.recorder.move(direction)  # Der Spawn folgt nach der Animation
             self.moving = True
             self.move_anim_progress = 0
             self.new_grid = new_grid
+            self.new_occupied = occupied
             self.animations = anims
             self.merges = merges
-            self.score += pts
-            
-            # Highscore aktualisieren
-            if self.score > self.high_score:
-                self.high_score = self.score
-                self._save_high_score()
+            self._add_points(pts)
                 
         return moved
 
+    def _add_points(self, pts):
+        self.total_moves += 1
+        self.score += pts
+
+        # Highscore aktualisieren
+        if self.score > self.high_score:
+            self.high_score = self.score
+            self._save_high_score()
+
+    def _finish_merge(self):
+        """Beendet die Merge-Animation und fügt die neue Kachel des Zuges hinzu."""
+        self.merge_scale = 1.0
+        self.merge_phase = 0  # Animation beenden
+        self.merges = []
+
+        # Merge-Animation beendet, neue Kachel hinzufügen
+        self.add_new_tile()
+        self.check_win()
+        if self.is_game_over():
+            self.game_over = True
+
+    def settle(self):
+        """Schließt eine laufende Merge-Animation ab, damit das Brett samt neuer Kachel feststeht (wie vor einem Zug)."""
+        if self.merge_phase > 0:
+            self._finish_merge()
+
+    def _set_grid(self, grid, occupied):
+        """Übernimmt ein neues Raster samt Belegungsmaske aus dem Zugergebnis."""
+        self.grid = grid
+        self.empty_mask = self.full_mask & ~occupied
+        self._mergeable = None
+        self._afterstates = None
+
+    def afterstates(self):
+        """
+        Alle vier Züge des aktuellen Bretts als (Raster, Punkte, moved) je Richtung.
+        Das Ergebnis bleibt gespeichert, bis sich das Brett ändert; move() übernimmt es dann direkt.
+        """
+        if self._afterstates is None:
+            self._afterstates = engine.afterstates(self.grid)
+        return self._afterstates
+
+    def sync_board(self):
+        """Berechnet die Metadaten neu, nachdem `grid` von außen gesetzt wurde."""
+        self._set_grid(self.grid, engine.occupancy(self.grid))
+        self.best_tile = engine.max_tile(self.grid)
+
     def is_game_over(self):
-        """Überprüft, ob keine Züge mehr möglich sind."""
-        # Prüfe auf leere Zellen
-        if any(self.grid[i][j] == 0 for i in range(self.config.GRID_SIZE) for j in range(self.config.GRID_SIZE)):
+        """Überprüft, ob keine Züge mehr möglich sind (Paarsuche nur bei vollem Brett, einmal pro Stand)."""
+        if self.empty_mask:
             return False
-            
-        # Prüfe horizontal
-        for i in range(self.config.GRID_SIZE):
-            for j in range(self.config.GRID_SIZE - 1):
-                if self.grid[i][j] == self.grid[i][j+1]:
-                    return False
-                    
-        # Prüfe vertikal
-        for i in range(self.config.GRID_SIZE - 1):
-            for j in range(self.config.GRID_SIZE):
-                if self.grid[i][j] == self.grid[i+1][j]:
-                    return False
-                    
-        return True
+        if self._mergeable is None:
+            self._mergeable = engine.has_merge(self.grid)
+        return not self._mergeable
 
     def check_win(self):
-        """Überprüft, ob 2048 erreicht wurde."""
-        if not self.game_won and any(self.grid[i][j] >= 2048 for i in range(self.config.GRID_SIZE) for j in range(self.config.GRID_SIZE)):
+        """Überprüft, ob 2048 erreicht wurde (best_tile ist die größte Kachel auf dem Brett)."""
+        if not self.game_won and self.best_tile >= 2048:
             self.game_won = True
             return True
         return False
@@ -284,9 +343,21 @@ class Game2048:
         """Ermöglicht das Weiterspielen nach dem Erreichen von 2048."""
         self.continue_after_win = True
 
-    def reset_game(self):
-        """Startet ein neues Spiel."""
+    def reset_game(self, forced_spawns=None):
+        """Startet ein neues Spiel (forced_spawns: vorgegebene Start-Kacheln als (Position, Wert))."""
+        if self._ai is not None:
+            self._ai.end_episode()  # Spielende an den Lerner melden
+        persistence.store.flush()  # Highscore des beendeten Spiels sofort schreiben
+        self.seed = random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.forced_spawns = deque(forced_spawns or ())
+        if self.recorder is not None:
+            self.recorder.end_game()
+            self.recorder.start(self.seed)
         self.grid = [[0 for _ in range(self.config.GRID_SIZE)] for _ in range(self.config.GRID_SIZE)]
+        self.empty_mask = self.full_mask
+        self._mergeable = None
+        self._afterstates = None
         self.score = 0
         self.game_over = False
         self.game_won = False
@@ -309,7 +380,7 @@ class Game2048:
             self.move_anim_progress += dt
             if self.move_anim_progress >= self.config.MOVE_ANIMATION_DURATION:
                 # Bewegungsanimation beendet
-                self.grid = self.new_grid
+                self._set_grid(self.new_grid, self.new_occupied)
                 self.moving = False
                 self.animations = []
                 self.new_grid = None
@@ -337,15 +408,7 @@ class Game2048:
             else:  # Schrumpfen
                 self.merge_scale -= scale_change
                 if self.merge_scale <= 1.0:  # Zurück zur Normalgröße
-                    self.merge_scale = 1.0
-                    self.merge_phase = 0  # Animation beenden
-                    self.merges = []
-                    
-                    # Merge-Animation beendet, neue Kachel hinzufügen
-                    self.add_new_tile()
-                    self.check_win()
-                    if self.is_game_over():
-                        self.game_over = True
+                    self._finish_merge()
         
         # Update Spawn-Animationen
         keys_to_remove = []
@@ -356,17 +419,28 @@ class Game2048:
         for key in keys_to_remove:
             del self.spawn_animations[key]
 
-    def draw(self, screen):
-        """Zeichnet das Spielfeld."""
-        screen.fill(self.config.BACKGROUND_COLOR)
-        
-        # Zeichne alle Zellen als Hintergrund (leere Felder)
-        for i in range(self.config.GRID_SIZE):
-            for j in range(self.config.GRID_SIZE):
-                x = self.config.GRID_PADDING + j * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                y = self.config.GRID_PADDING + i * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                pygame.draw.rect(screen, self.config.TILE_COLORS.get(0, self.config.EMPTY_CELL_COLOR),
-                                 (x, y, self.config.CELL_SIZE, self.config.CELL_SIZE), 0, 5)
+    def is_animating(self):
+        """True, solange eine Bewegungs-, Merge- oder Spawn-Animation läuft."""
+        return self.moving or self.merge_phase > 0 or bool(self.spawn_animations)
+
+    def finish_animations(self):
+        """Schließt laufende Animationen sofort ab (z.B. beim Wechsel in den Schnelldurchlauf)."""
+        while self.is_animating():
+            self.update(1.0)
+
+    def invalidate(self):
+        """Erzwingt beim nächsten draw() ein komplettes Neuzeichnen (z.B. nach einem Expose-Event)."""
+        self._last_scene = None
+
+    def scene(self):
+        """
+        Baut die Zeichenliste des aktuellen Frames: [(Surface, (x, y)), ...] in Zeichenreihenfolge.
+        Alle Surfaces kommen aus dem TileCache, gleiche Inhalte liefern also dieselben Objekte.
+        """
+        cfg = self.config
+        tiles = self.tiles
+        step = cfg.CELL_SIZE + cfg.CELL_MARGIN
+        items = []
 
         # Erstelle eine Menge der Zellen, die animiert werden
         animated_origins = set()
@@ -375,202 +449,152 @@ class Game2048:
                 animated_origins.add((anim['row'], anim['start_idx']))
             else:
                 animated_origins.add((anim['start_idx'], anim['col']))
-        
-        # Zeichne stationäre Kacheln
-        for i in range(self.config.GRID_SIZE):
-            for j in range(self.config.GRID_SIZE):
-                # Falls diese Zelle gerade animiert wird, überspringen
-                if (i, j) in animated_origins:
-                    continue
-                    
+
+        # Stationäre Kacheln (leere Felder liegen im Hintergrund)
+        for i in range(cfg.GRID_SIZE):
+            for j in range(cfg.GRID_SIZE):
                 value = self.grid[i][j]
-                if value != 0:
-                    x = self.config.GRID_PADDING + j * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    y = self.config.GRID_PADDING + i * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    
-                    # Skalieren, wenn diese Zelle Teil eines Merges ist
-                    scale = 1.0
-                    if (i, j) in self.merges and self.merge_phase > 0:
-                        scale = self.merge_scale
-                    
-                    # Berechne skalierte Position und Größe
-                    if scale != 1.0:
-                        scaled_size = int(self.config.CELL_SIZE * scale)
-                        offset = (self.config.CELL_SIZE - scaled_size) // 2
-                        rect = (x + offset, y + offset, scaled_size, scaled_size)
-                    else:
-                        rect = (x, y, self.config.CELL_SIZE, self.config.CELL_SIZE)
-                    
-                    pygame.draw.rect(screen, self.config.TILE_COLORS.get(value, self.config.TILE_COLORS[2048]),
-                                     rect, 0, 5)
-                                     
-                    # Wähle Schriftgröße basierend auf Ziffernanzahl
-                    if value < 10:
-                        f = self.config.font['large']
-                    elif value < 100:
-                        f = self.config.font['medium']
-                    elif value < 1000:
-                        f = self.config.font['small']
-                    else:
-                        f = self.config.font['extra_small']
-                        
-                    text = f.render(str(value), True, self.config.TEXT_COLORS.get(value, self.config.FONT_COLOR))
-                    
-                    # Positioniere Text im Zentrum der skalierten Kachel
-                    text_rect = text.get_rect(center=(x + self.config.CELL_SIZE // 2, y + self.config.CELL_SIZE // 2))
-                    
-                    screen.blit(text, text_rect)
-        
-        # Zeichne Bewegungsanimationen
+                # Falls diese Zelle gerade animiert wird oder erscheint, überspringen
+                if value == 0 or (i, j) in animated_origins or (i, j) in self.spawn_animations:
+                    continue
+                x = cfg.GRID_PADDING + j * step
+                y = cfg.GRID_PADDING + i * step
+
+                # Skalieren, wenn diese Zelle Teil eines Merges ist
+                if self.merge_phase > 0 and (i, j) in self.merges and self.merge_scale != 1.0:
+                    sprite = tiles.tile(value, cfg.CELL_SIZE * self.merge_scale)
+                    offset = (cfg.CELL_SIZE - sprite.get_width()) // 2
+                    items.append((sprite, (x + offset, y + offset)))
+                else:
+                    items.append((tiles.tile(value), (x, y)))
+
+        # Bewegungsanimationen
         if self.moving:
-            t = min(self.move_anim_progress / self.config.MOVE_ANIMATION_DURATION, 1.0)
+            t = min(self.move_anim_progress / cfg.MOVE_ANIMATION_DURATION, 1.0)
             for anim in self.animations:
+                start = cfg.GRID_PADDING + anim['start_idx'] * step
+                end = cfg.GRID_PADDING + anim['end_idx'] * step
+                current = int(start + (end - start) * t)
                 if anim['horizontal']:
-                    row = anim['row']
-                    start_x = self.config.GRID_PADDING + anim['start_idx'] * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    end_x = self.config.GRID_PADDING + anim['end_idx'] * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    y = self.config.GRID_PADDING + row * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    current_x = start_x + (end_x - start_x) * t
-                    current_y = y
+                    pos = (current, cfg.GRID_PADDING + anim['row'] * step)
                 else:
-                    col = anim['col']
-                    start_y = self.config.GRID_PADDING + anim['start_idx'] * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    end_y = self.config.GRID_PADDING + anim['end_idx'] * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    x = self.config.GRID_PADDING + col * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-                    current_y = start_y + (end_y - start_y) * t
-                    current_x = x
-                
-                # Zeichne die animierte Kachel
-                pygame.draw.rect(screen, self.config.TILE_COLORS.get(anim['value'], self.config.TILE_COLORS[2048]),
-                                 (current_x, current_y, self.config.CELL_SIZE, self.config.CELL_SIZE), 0, 5)
-                
-                # Zeichne den Text
-                if anim['value'] < 10:
-                    f = self.config.font['large']
-                elif anim['value'] < 100:
-                    f = self.config.font['medium']
-                elif anim['value'] < 1000:
-                    f = self.config.font['small']
-                else:
-                    f = self.config.font['extra_small']
-                    
-                text = f.render(str(anim['value']), True, self.config.TEXT_COLORS.get(anim['value'], self.config.FONT_COLOR))
-                text_rect = text.get_rect(center=(current_x + self.config.CELL_SIZE // 2, current_y + self.config.CELL_SIZE // 2))
-                screen.blit(text, text_rect)
+                    pos = (cfg.GRID_PADDING + anim['col'] * step, current)
+                items.append((tiles.tile(anim['value']), pos))
 
-        # Zeichne Spawn-Animationen
+        # Spawn-Animationen
         for (i, j), anim_time in self.spawn_animations.items():
-            value = self.grid[i][j]
-            x = self.config.GRID_PADDING + j * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-            y = self.config.GRID_PADDING + i * (self.config.CELL_SIZE + self.config.CELL_MARGIN)
-            scale = min(anim_time / self.config.SPAWN_ANIMATION_DURATION, 1.0)
-            scaled_size = int(self.config.CELL_SIZE * scale)
-            offset = (self.config.CELL_SIZE - scaled_size) // 2
-            rect = (x + offset, y + offset, scaled_size, scaled_size)
-            pygame.draw.rect(screen, self.config.TILE_COLORS.get(value, self.config.TILE_COLORS[2048]),
-                             rect, 0, 5)
-                             
-            if scale >= 0.5:  # Text erst anzeigen, wenn Kachel groß genug
-                if value < 10:
-                    f = self.config.font['large']
-                elif value < 100:
-                    f = self.config.font['medium']
-                elif value < 1000:
-                    f = self.config.font['small']
-                else:
-                    f = self.config.font['extra_small']
-                    
-                text = f.render(str(value), True, self.config.TEXT_COLORS.get(value, self.config.FONT_COLOR))
-                text_rect = text.get_rect(center=(x + self.config.CELL_SIZE // 2, y + self.config.CELL_SIZE // 2))
-                
-                # Skaliere Textgröße mit der Animation
-                text_scale = min(1.0, (scale - 0.5) * 2)  # 0.5 -> 0, 1.0 -> 1.0
-                if text_scale > 0:
-                    scaled_text = pygame.transform.scale(
-                        text, 
-                        (int(text.get_width() * text_scale), 
-                         int(text.get_height() * text_scale))
-                    )
-                    scaled_rect = scaled_text.get_rect(center=(x + self.config.CELL_SIZE // 2, y + self.config.CELL_SIZE // 2))
-                    screen.blit(scaled_text, scaled_rect)
-        
-        # Zeichne Statistikbereich
-        pygame.draw.rect(screen, (187, 173, 160), 
-                         (0, self.config.WINDOW_HEIGHT - 50, self.config.WINDOW_WIDTH, 50))
-        
-        # Zeige Punktzahl und Highscore
-        score_text = self.config.font['small'].render(f"Score: {self.score}", True, self.config.TEXT_COLOR_BRIGHT)
-        high_score_text = self.config.font['small'].render(f"Best: {self.high_score}", True, self.config.TEXT_COLOR_BRIGHT)
-        best_tile_text = self.config.font['extra_small'].render(f"Best Tile: {self.best_tile}", True, self.config.TEXT_COLOR_BRIGHT)
-        
-        screen.blit(score_text, (10, self.config.WINDOW_HEIGHT - 45))
-        screen.blit(high_score_text, (self.config.WINDOW_WIDTH - high_score_text.get_width() - 10, self.config.WINDOW_HEIGHT - 45))
-        screen.blit(best_tile_text, (self.config.WINDOW_WIDTH // 2 - best_tile_text.get_width() // 2, self.config.WINDOW_HEIGHT - 35))
-        
-        # Zeichne Win-Bildschirm
+            scale = min(anim_time / cfg.SPAWN_ANIMATION_DURATION, 1.0)
+            sprite = tiles.tile(self.grid[i][j], cfg.CELL_SIZE * scale)
+            offset = (cfg.CELL_SIZE - sprite.get_width()) // 2
+            items.append((sprite, (cfg.GRID_PADDING + j * step + offset, cfg.GRID_PADDING + i * step + offset)))
+
+        # Punktzahl und Highscore
+        score_text = tiles.text('small', f"Score: {self.score}", cfg.TEXT_COLOR_BRIGHT)
+        high_score_text = tiles.text('small', f"Best: {self.high_score}", cfg.TEXT_COLOR_BRIGHT)
+        best_tile_text = tiles.text('extra_small', f"Best Tile: {self.best_tile}", cfg.TEXT_COLOR_BRIGHT)
+        items.append((score_text, (10, cfg.WINDOW_HEIGHT - 45)))
+        items.append((high_score_text, (cfg.WINDOW_WIDTH - high_score_text.get_width() - 10, cfg.WINDOW_HEIGHT - 45)))
+        items.append((best_tile_text, (cfg.WINDOW_WIDTH // 2 - best_tile_text.get_width() // 2, cfg.WINDOW_HEIGHT - 35)))
+
+        # Win-Bildschirm
         if self.game_won and not self.continue_after_win:
-            overlay = pygame.Surface((self.config.WINDOW_WIDTH, self.config.WINDOW_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((255, 255, 255, 180))
-            screen.blit(overlay, (0, 0))
-            
-            win_text = self.config.font['large'].render("You Win!", True, (119, 110, 101))
-            continue_text = self.config.font['medium'].render("Drücke C zum Weiterspielen", True, (119, 110, 101))
-            restart_text = self.config.font['medium'].render("Drücke R zum Neustart", True, (119, 110, 101))
-            
-            screen.blit(win_text, (self.config.WINDOW_WIDTH // 2 - win_text.get_width() // 2, 
-                                  self.config.WINDOW_HEIGHT // 2 - win_text.get_height() // 2 - 60))
-            screen.blit(continue_text, (self.config.WINDOW_WIDTH // 2 - continue_text.get_width() // 2, 
-                                      self.config.WINDOW_HEIGHT // 2 - continue_text.get_height() // 2))
-            screen.blit(restart_text, (self.config.WINDOW_WIDTH // 2 - restart_text.get_width() // 2, 
-                                     self.config.WINDOW_HEIGHT // 2 - restart_text.get_height() // 2 + 60))
-        
-        # Zeichne Game Over-Bildschirm
+            items.append((tiles.overlay('win', [
+                ('large', "You Win!"),
+                ('medium', "Drücke C zum Weiterspielen"),
+                ('medium', "Drücke R zum Neustart"),
+            ]), (0, 0)))
+
+        # Game Over-Bildschirm
         elif self.game_over:
-            overlay = pygame.Surface((self.config.WINDOW_WIDTH, self.config.WINDOW_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((255, 255, 255, 180))
-            screen.blit(overlay, (0, 0))
-            
-            go_text = self.config.font['large'].render("Game Over", True, (119, 110, 101))
-            retry_text = self.config.font['medium'].render("Drücke R zum Neustart", True, (119, 110, 101))
-            final_score_text = self.config.font['medium'].render(f"Score: {self.score}", True, (119, 110, 101))
-            
-            screen.blit(go_text, (self.config.WINDOW_WIDTH // 2 - go_text.get_width() // 2, 
-                                 self.config.WINDOW_HEIGHT // 2 - go_text.get_height() // 2 - 60))
-            screen.blit(final_score_text, (self.config.WINDOW_WIDTH // 2 - final_score_text.get_width() // 2, 
-                                         self.config.WINDOW_HEIGHT // 2 - final_score_text.get_height() // 2))
-            screen.blit(retry_text, (self.config.WINDOW_WIDTH // 2 - retry_text.get_width() // 2, 
-                                   self.config.WINDOW_HEIGHT // 2 - retry_text.get_height() // 2 + 60))
-            
-            
-    def auto_move(self):
+            items.append((tiles.overlay('game_over', [
+                ('large', "Game Over"),
+                ('medium', f"Score: {self.score}"),
+                ('medium', "Drücke R zum Neustart"),
+            ]), (0, 0)))
+        return items
+
+    def draw(self, screen, hud=()):
+        """
+        Zeichnet nur die Bereiche neu, die sich seit dem letzten Frame geändert haben.
+        hud: zusätzliche (Surface, (x, y))-Einträge, die über dem Spielfeld liegen (Hinweise, Debug-Overlay).
+        Gibt die geänderten Rechtecke für pygame.display.update() zurück (leer, wenn nichts passiert ist).
+        """
+        if self.tiles.validate():
+            self._last_scene = None
+        background = self.tiles.background()
+        items = self.scene()
+        items.extend(hud)
+
+        if self._last_scene is None:
+            screen.blit(background, (0, 0))
+            for surface, pos in items:
+                screen.blit(surface, pos)
+            self._last_scene = set(items)
+            return [screen.get_rect()]
+
+        # Geänderte Einträge: was verschwunden ist und was neu hinzukam
+        current = set(items)
+        changed = current.symmetric_difference(self._last_scene)
+        self._last_scene = current
+        if not changed:
+            return []
+        dirty = merge_rects([pygame.Rect(pos, surface.get_size()) for surface, pos in changed], screen.get_rect())
+
+        # Jeden Bereich aus dem Hintergrund wiederherstellen und alle überlappenden Einträge neu zeichnen
+        for rect in dirty:
+            screen.set_clip(rect)
+            screen.blit(background, rect, rect)
+            for surface, pos in items:
+                if rect.colliderect(pygame.Rect(pos, surface.get_size())):
+                    screen.blit(surface, pos)
+        screen.set_clip(None)
+        return dirty
+
+    def _ready_for_bot(self):
+        """
+        Bereitet eine Zugwahl vor: der Spawn des letzten Zuges wird vorgezogen, damit auf dem Brett
+        entschieden (und gelernt) wird, auf das der Zug auch angewendet wird. False, wenn kein Zug möglich ist.
+        """
+        if self.moving:
+            return False
+        self.settle()
+        return not (self.game_over or (self.game_won and not self.continue_after_win))
+
+    def auto_move(self, instant=False):
         """Wählt eine Richtung basierend auf der Strategie aus."""
-        
-        # Überprüfen, ob die rechte Spalte vollständig gefüllt ist
-        right_column_full = all(self.grid[i][self.config.GRID_SIZE - 1] != 0 for i in range(self.config.GRID_SIZE))
-        
-        # Bevorzugte Richtung: Rechts
-        if self.move(1):  # Rechts (1)
-            return
-        
-        # Zweite Wahl: Nach unten (wenn die rechte Spalte voll ist)
-        if right_column_full and self.move(2):  # Unten (2)
+        if not self._ready_for_bot():
             return
-        
-        # Falls Rechts und Unten nicht möglich sind, Notfallstrategie:
-        if self.move(0):  # Hoch (0)
+
+        # Zugwahl auf dem Bitboard statt bis zu vier kompletter compute_move-Aufrufe (nur 4x4)
+        if self.config.GRID_SIZE == 4 and bitboard.fits(self.grid):
+            direction = engine.auto_move_policy(bitboard.from_grid(self.grid))
+        else:  # Größeres Feld oder Kachel ab 32768: gleiche Strategie auf dem Raster
+            right_column_full = all(row[-1] != 0 for row in self.grid)
+            order = (1, 2, 0, 3) if right_column_full else (1, 0, 3)
+            direction = next((d for d in order if engine.can_move(self.grid, d)), None)
+        if direction is not None:
+            self.move(direction, instant)
+
+    def auto_player_move(self, player, instant=False):
+        """Lässt einen Spieler mit choose_action(game) ziehen (z.B. die Expectimax-Suche)."""
+        if not self._ready_for_bot():
             return
-        
-        if self.move(3):  # Links (3) als letzter Ausweg
+        action = player.choose_action(self)
+        if action is not None:
+            self.move(action, instant)
+
+    def auto_ai_move(self, instant=False):
+        """Lässt die KI das Spiel spielen (instant: ohne Animation, new_state ist dann bereits das neue Brett)."""
+        if not self._ready_for_bot():
             return
-        
-    def auto_ai_move(self):
-        """Lässt die KI das Spiel spielen."""
         old_state = self.ai.get_state(self.grid)
         action = self.ai.choose_action(self)
-        moved = self.move(action)
+        afterstate = self.afterstates()[action][0]  # Brett nach genau diesem Zug, move() übernimmt es
+        score_before = self.score
+        moved = self.move(action, instant)
 
         if moved:
-            reward = self.score  # Belohnung = aktuelle Punktzahl
+            reward = self.score - score_before  # Belohnung = Punkte dieses Zuges
             new_state = self.ai.get_state(self.grid)
-            self.ai.update_q_table(old_state, action, reward, new_state)
+            self.ai.update_q_table(old_state, action, reward, new_state, self.game_over, afterstate=afterstate)
             self.ai.decay_exploration()  # Exploration reduzieren
\ No newline at end of file
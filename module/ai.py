@@ -2,10 +2,60 @@ import numpy as np
 import random
 import pickle
 import os
+from types import SimpleNamespace
+from module import bitboard, bigboard, engine, persistence
+from module.modelstore import ModelFile, QTable
+from module.replay import ReplayBuffer
+
+_ZERO_Q = np.zeros(4)  # Geteilter Standardwert für unbekannte Zustände (wird nie verändert)
+_ZERO_Q.flags.writeable = False
+_ACTION_TO_CANON = np.array(bitboard.ACTION_TO_CANON)  # [Symmetrie, Richtung] -> Richtung im kanonischen Brett
+
+def save_model_info(ai, path):
+    """Merkt Version und Statistiken eines Modells zum Schreiben in eine Textdatei vor (Write-Behind)."""
+    persistence.store.put(path, f"Version: {ai.version}\n"
+                                f"Best Score: {ai.best_score}\n"
+                                f"Best Tile: {ai.best_tile}\n"
+                                f"Games Played: {ai.games_played}\n")
+
+
+def load_model_info(ai, path):
+    """Liest Version und Statistiken eines Modells aus einer Textdatei, falls vorhanden."""
+    text = persistence.store.read(path)
+    if text is None:
+        return
+    for line in text.splitlines():
+        if "Version" in line:
+            ai.version = int(line.split(": ")[1])
+        elif "Best Score" in line:
+            ai.best_score = int(line.split(": ")[1])
+        elif "Best Tile" in line:
+            ai.best_tile = int(line.split(": ")[1])
+        elif "Games Played" in line:
+            ai.games_played = int(line.split(": ")[1])
+
 
 class AI2048:
-    def __init__(self, learning_rate=0.1, discount_factor=0.9, exploration_rate=1.0, exploration_decay=0.995):
-        self.q_table = {}
+    def __init__(self, learning_rate=0.1, discount_factor=0.9, exploration_rate=1.0, exploration_decay=0.995, load=True,
+                 max_entries=500000, eviction="lru", replay_capacity=None, batch_size=32, replay_every=4, grid_size=4,
+                 writer=None):
+        self.grid_size = grid_size
+        self.writer = writer  # Optionaler CheckpointWriter: verdrängte Einträge werden dann im Hintergrund geschrieben
+        self.max_entries = max_entries  # Obergrenze der Q-Tabelle im Arbeitsspeicher (None = unbegrenzt)
+        self.eviction = eviction        # Verdrängung: "lru" oder "visits"
+        # Experience Replay: Übergänge sammeln und in Minibatches lernen (None = direkt pro Zug)
+        self.replay = ReplayBuffer(replay_capacity, batch_size) if replay_capacity else None
+        self.replay_every = replay_every  # Ein Minibatch pro `replay_every` Übergänge
+        self._replay_steps = 0
+        self._batch_q = np.zeros((batch_size, 4))
+        self._batch_next = np.zeros((batch_size, 4))
+        self._batch_rows = np.arange(batch_size)
+        # Eigenes Modell pro Feldgröße (4x4 behält die bisherigen Dateinamen)
+        suffix = "" if grid_size == 4 else f"_{grid_size}x{grid_size}"
+        self.model_path = f"app_data/ai_model{suffix}.bin"
+        self.info_path = f"app_data/model_info{suffix}.txt"
+        self.q_table = self._new_table()
+        self._last_state = (None, None)  # (Raster, Zustand) der letzten Umrechnung, wird pro Zug mehrfach gebraucht
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.exploration_rate = exploration_rate
@@ -15,67 +65,147 @@ class AI2048:
         self.best_tile = 0
         self.version = 1  # Modellversion
         # Lade vorheriges Modell (falls vorhanden)
-        self.load_model()
+        if load:
+            self.load_model()
+
+    def _new_table(self, model_file=None):
+        return QTable(model_file, path=self.model_path, max_entries=self.max_entries, eviction=self.eviction, writer=self.writer)
 
     def get_state(self, grid):
-        return tuple(map(tuple, grid))
+        """
+        Zustand = (kanonischer 64-Bit-Schlüssel, Symmetrie-Index).
+        Alle acht Drehungen/Spiegelungen eines Bretts teilen sich einen Eintrag der Q-Tabelle.
+        Größere Felder und Bretter ab 32768 passen nicht in ein Bitboard, ihr Schlüssel ist ein Hash (siehe bigboard).
+        """
+        last_grid, state = self._last_state
+        if grid != last_grid:
+            if self.grid_size == 4 and bitboard.fits(grid):
+                state = bitboard.canonical(bitboard.from_grid(grid))
+            else:
+                state = bigboard.canonical(grid)
+            self._last_state = ([row[:] for row in grid], state)
+        return state
 
     def choose_action(self, game):
-        state = self.get_state(game.grid)
+        """
+        Berechnet alle vier Afterstates auf einmal und wählt nur unter den gültigen Zügen:
+        bekannte Zustände nach Q-Wert, unbekannte nach den Punkten des Zuges.
+        Bei Game2048 bleiben die Afterstates gespeichert und werden vom folgenden move() übernommen.
+        """
+        grid = game.grid
+        if hasattr(game, "afterstates"):
+            moves = game.afterstates()
+        elif self.grid_size == 4 and bitboard.fits(grid):  # Ohne Spielobjekt (Engine2048, Schnappschüsse) genügen die Bitboard-Züge
+            board = bitboard.from_grid(grid)
+            moves = [(after, points, after != board) for after, points in bitboard.all_moves(board)]
+        else:
+            moves = engine.afterstates(grid)
+        legal = [m[2] for m in moves]
+        if not any(legal):
+            return random.choice([0, 1, 2, 3])  # Kein Zug verändert das Brett (Spielende)
         if random.random() < self.exploration_rate:
-            return random.choice([0, 1, 2, 3])  # Zufallsbewegung
-        if state in self.q_table:
-            return np.argmax(self.q_table[state])
-        return random.choice([0, 1, 2, 3])
+            return random.choice([d for d in engine.DIRECTIONS if legal[d]])  # Zufallsbewegung
+        key, sym = self.get_state(grid)
+        q_values = self.q_table.get(key)
+        if q_values is not None:
+            scores = q_values[_ACTION_TO_CANON[sym]]  # Q-Werte in echter Zugrichtung
+        else:
+            scores = np.array([m[1] for m in moves])  # Unbekannt: Punkte des Zuges (gierig)
+        return int(np.argmax(np.where(legal, scores, -np.inf)))
 
-    def update_q_table(self, old_state, action, reward, new_state):
-        old_q_value = self.q_table.get(old_state, np.zeros(4))[action]
-        future_q_value = max(self.q_table.get(new_state, np.zeros(4)))
-        new_q_value = old_q_value + self.learning_rate * (reward + self.discount_factor * future_q_value - old_q_value)
+    def update_q_table(self, old_state, action, reward, new_state, done=False, afterstate=None):
+        """Q-Learning-Update für einen Zug (`afterstate` brauchen nur Afterstate-Lerner wie NTupleAI)."""
+        old_key, old_sym = old_state
+        action = bitboard.ACTION_TO_CANON[old_sym][action]  # Richtung im kanonischen Brett
+        if self.replay is not None:
+            self.replay.add(old_key, action, reward, new_state[0], done)
+            self._replay_steps += 1
+            if self._replay_steps % self.replay_every == 0 and len(self.replay) >= self.replay.batch_size:
+                self.replay_update()
+            return
 
-        if old_state not in self.q_table:
-            self.q_table[old_state] = np.zeros(4)
-        self.q_table[old_state][action] = new_q_value
+        old_q_values = self.q_table.get(old_key)
+        old_q_values = np.zeros(4) if old_q_values is None else old_q_values
+        future_q_value = 0.0 if done else self.q_table.get(new_state[0], _ZERO_Q).max()
+        old_q_values[action] += self.learning_rate * (reward + self.discount_factor * future_q_value - old_q_values[action])
+        self.q_table[old_key] = old_q_values  # Zuweisung markiert den Eintrag als geändert
+
+    def replay_update(self):
+        """
+        Lernt auf einem Minibatch aus dem Replay-Puffer. Die Q-Werte werden gesammelt gelesen und
+        zurückgeschrieben (QTable.gather/scatter, Nachladen per gemeinsamer Binärsuche), die TD-Rechnung läuft vektorisiert.
+        """
+        states, actions, rewards, next_states, dones = self.replay.sample()
+        q, next_q, rows = self._batch_q, self._batch_next, self._batch_rows
+        self.q_table.gather(states, q)
+        future = self.q_table.gather(next_states, next_q).max(axis=1)
+
+        future[dones] = 0.0
+        current = q[rows, actions]
+        q[rows, actions] = current + self.learning_rate * (rewards + self.discount_factor * future - current)
+        self.q_table.scatter(states, q)  # Bestehende Einträge an Ort und Stelle, neue bekommen ein eigenes Array
+
+    def end_episode(self):
+        """Wird am Spielende aufgerufen: der letzte Übergang im Replay-Puffer führt ins Spielende."""
+        if self.replay is not None:
+            self.replay.mark_done()
 
     def decay_exploration(self):
         self.exploration_rate *= self.exploration_decay
         self.exploration_rate = max(0.01, self.exploration_rate)
 
-    def save_model(self):
-        """Speichert das Modell nur nach einem abgeschlossenen Spiel (kein ständiges Speichern mehr)."""
+    def save_model(self, writer=None):
+        """
+        Speichert nur die seit dem letzten Speichern geänderten Einträge (kein komplettes Neuschreiben).
+        Mit `writer` (asyncai.CheckpointWriter) wird eine Kopie im Hintergrund geschrieben.
+        """
         self.version += 1  # Versionsnummer erhöhen
-        filename = "app_data/ai_model.pkl"  # Speicherort im app_data-Ordner
-        with open(filename, "wb") as f:
-            pickle.dump(self.q_table, f)
-        
-        # Speichere Modellinfos mit Version
-        with open("app_data/model_info.txt", "w") as f:  # Speicherort im app_data-Ordner
-            f.write(f"Version: {self.version}\n")
-            f.write(f"Best Score: {self.best_score}\n")
-            f.write(f"Best Tile: {self.best_tile}\n")
-            f.write(f"Games Played: {self.games_played}\n")
-        
-        print(f"💾 Modell gespeichert als {filename} (Version {self.version})")
+        os.makedirs("app_data", exist_ok=True)
+        stats = {
+            "version": self.version,
+            "games_played": self.games_played,
+            "best_score": self.best_score,
+            "best_tile": self.best_tile,
+        }
+        self.q_table.save(self.model_path, stats, writer)
+        if writer is None:
+            self._write_info(stats)
+        else:
+            writer.submit(self._write_info, stats)
+
+    def _write_info(self, stats):
+        # Speichere Modellinfos mit Version (lesbare Kopie der Header-Statistiken)
+        save_model_info(SimpleNamespace(**stats), self.info_path)  # Speicherort im app_data-Ordner
+        print(f"💾 Modell gespeichert als {self.model_path} (Version {stats['version']})")
 
     def load_model(self):
-        """Lädt das bestehende Modell, falls vorhanden."""
-        if os.path.exists("app_data/ai_model.pkl"):  # Pfad angepasst
-            with open("app_data/ai_model.pkl", "rb") as f:
-                self.q_table = pickle.load(f)
-            print("📥 Modell geladen: app_data/ai_model.pkl")
-
-        # Lade gespeicherte Infos und Versionsnummer
-        if os.path.exists("app_data/model_info.txt"):  # Pfad angepasst
-            with open("app_data/model_info.txt", "r") as f:
-                lines = f.readlines()
-                for line in lines:
-                    if "Version" in line:
-                        self.version = int(line.split(": ")[1])
-                    elif "Best Score" in line:
-                        self.best_score = int(line.split(": ")[1])
-                    elif "Best Tile" in line:
-                        self.best_tile = int(line.split(": ")[1])
-                    elif "Games Played" in line:
-                        self.games_played = int(line.split(": ")[1])
-
-        print(f"🔄 Aktuelle Modell-Version: {self.version}")
\ No newline at end of file
+        """Öffnet das bestehende Modell per memmap, falls vorhanden."""
+        if os.path.exists(self.model_path):
+            model_file = ModelFile(self.model_path)
+            self.q_table = self._new_table(model_file)
+            self.version = model_file.stats["version"]
+            self.games_played = model_file.stats["games_played"]
+            self.best_score = model_file.stats["best_score"]
+            self.best_tile = model_file.stats["best_tile"]
+            print(f"📥 Modell geladen: {self.model_path} ({len(model_file)} Zustände)")
+        else:
+            # Lade gespeicherte Infos und Versionsnummer
+            load_model_info(self, self.info_path)  # Pfad angepasst
+            if self.grid_size == 4 and os.path.exists("app_data/ai_model.pkl"):
+                self._import_pickle("app_data/ai_model.pkl")
+
+        print(f"🔄 Aktuelle Modell-Version: {self.version}")
+
+    def _import_pickle(self, filename):
+        """Übernimmt ein altes Pickle-Modell (Tupel-Schlüssel) in das Binärformat."""
+        with open(filename, "rb") as f:
+            old_table = pickle.load(f)
+        self.q_table = self._new_table()
+        for state, q_values in old_table.items():
+            if not bitboard.fits(state):
+                continue  # Ab 32768 gälte der Hash-Schlüssel aus bigboard, dessen Symmetrien nicht zu ACTION_TO_CANON passen
+            key, sym = bitboard.canonical(bitboard.from_grid(state))
+            canonical_q = np.zeros(4)
+            canonical_q[list(bitboard.ACTION_TO_CANON[sym])] = q_values
+            self.q_table[key] = canonical_q
+        print(f"📥 Altes Modell übernommen: {filename} ({len(self.q_table)} Zustände)")
@@ -0,0 +1,146 @@
+import queue
+import threading
+
+# Entscheidungen und Speichern abseits der Hauptschleife:
+#   AsyncPlayer      – rechnet choose_action eines Spielers in einem Worker-Thread auf einer Kopie
+#                      des Bretts; die Hauptschleife holt fertige Züge über eine Queue ab und
+#                      zeichnet in der Zwischenzeit weiter.
+#   CheckpointWriter – führt Schreibvorgänge (Modell-Checkpoints) der Reihe nach im Hintergrund aus.
+# Ändert sich das Brett, bevor eine Entscheidung fertig ist, wird sie verworfen und für das
+# neue Brett neu gerechnet. Eine bereits laufende Suche läuft zu Ende (Threads lassen sich nicht
+# abbrechen), ihr Ergebnis wird aber nicht mehr ausgeführt.
+
+
+class _Snapshot:
+    """Kopie des Spielbretts, auf der der Worker rechnet (Spieler brauchen nur `grid`)."""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+
+def _board_key(grid):
+    return tuple(map(tuple, grid))
+
+
+class AsyncPlayer:
+    """
+    Führt einen Spieler mit choose_action(game) (z.B. ExpectimaxAI, MonteCarloAI) im Hintergrund aus.
+    Nutzung pro Frame: `player.step(game)` – zieht, sobald die Entscheidung für das aktuelle Brett
+    vorliegt, und blockiert nie. `choose_action(game)` wartet dagegen auf das Ergebnis (Schnelldurchlauf).
+    """
+
+    def __init__(self, player):
+        self.player = player
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._wanted = None  # Brett, dessen Entscheidung gerade gebraucht wird
+        self._thread = threading.Thread(target=self._run, name=f"ai-{type(player).__name__}", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name):
+        return getattr(self.player, name)  # z.B. rollouts_per_sec für das Debug-Overlay
+
+    def _run(self):
+        while True:
+            job = self._requests.get()
+            # Nur der neueste Auftrag zählt, ältere sind durch Züge oder Resets überholt
+            while job is not None:
+                try:
+                    job = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if job is None:
+                break
+            key, grid = job
+            if key != self._wanted:
+                continue  # Inzwischen abgebrochen
+            try:
+                action = self.player.choose_action(_Snapshot(grid))
+            except Exception as e:
+                print(f"⚠️ KI-Entscheidung fehlgeschlagen: {e}")
+                action = None
+            self._results.put((key, action))
+
+    def _submit(self, grid):
+        """Beauftragt eine Entscheidung für das Brett, falls nicht schon geschehen."""
+        key = _board_key(grid)
+        if key != self._wanted:
+            self._wanted = key
+            self._requests.put((key, [row[:] for row in grid]))
+        return key
+
+    def poll(self, game):
+        """Gibt (fertig, Richtung) für das aktuelle Brett zurück, ohne zu warten."""
+        key = self._submit(game.grid)
+        while True:
+            try:
+                done, action = self._results.get_nowait()
+            except queue.Empty:
+                return False, None
+            if done == key:
+                self._wanted = None
+                return True, action
+
+    def step(self, game, instant=False):
+        """Führt die Entscheidung aus, sobald sie vorliegt; gibt True zurück, wenn gezogen wurde."""
+        if game.moving:
+            return False
+        game.settle()  # Der Spawn des letzten Zuges gehört zum Brett, für das entschieden wird
+        if game.game_over or (game.game_won and not game.continue_after_win):
+            return False
+        ready, action = self.poll(game)
+        return ready and action is not None and game.move(action, instant)
+
+    def choose_action(self, game):
+        """Wartet auf die Entscheidung für das aktuelle Brett (gleiche Schnittstelle wie der Spieler selbst)."""
+        key = self._submit(game.grid)
+        while True:
+            done, action = self._results.get()
+            if done == key:
+                self._wanted = None
+                return action
+
+    def cancel(self):
+        """Verwirft ausstehende Entscheidungen (z.B. beim Ausschalten des Bots)."""
+        self._wanted = None
+
+    def close(self):
+        self.cancel()
+        self._requests.put(None)
+        self._thread.join()
+        if hasattr(self.player, "close"):
+            self.player.close()
+
+
+class CheckpointWriter:
+    """Ein Hintergrund-Thread, der übergebene Schreibaufträge in Reihenfolge ausführt."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    break
+                func, args = job
+                func(*args)
+            except Exception as e:
+                print(f"⚠️ Speichern im Hintergrund fehlgeschlagen: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, func, *args):
+        self._queue.put((func, args))
+
+    def flush(self):
+        """Wartet, bis alle bisher übergebenen Aufträge geschrieben sind."""
+        self._queue.join()
+
+    def close(self):
+        """Schreibt alle ausstehenden Aufträge und beendet den Thread."""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,308 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Reproduzierbare Benchmarks für Engine, KI und Renderer:
+#   python -m module.benchmark --out benchmark.json --baseline benchmarks/baseline.json
+# Alle Läufe sind geseedet und laufen in einem temporären Verzeichnis (eigene app_data,
+# das Modell des Spielers bleibt unberührt). Mit --baseline wird gegen gespeicherte
+# Ergebnisse verglichen; Verschlechterungen über --threshold gelten als Regression.
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Zeichnen ohne Fenster
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from module import persistence
+from module.Gamemodule import Game2048
+from module.ai import AI2048
+
+
+@contextlib.contextmanager
+def _scratch_dir():
+    """
+    Temporäres Arbeitsverzeichnis ohne Konsolenausgabe. Verzögerte Schreibvorgänge (Highscore,
+    Modellinfos) werden noch darin geschrieben, bevor es gelöscht wird – nie in die echten app_data.
+    """
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            persistence.store.flush()
+            os.chdir(cwd)
+
+
+def _timed(func, repeat):
+    """Beste Laufzeit von `func` über `repeat` Wiederholungen in Sekunden (robuster gegen Störungen als der Mittelwert)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _result(value, unit, higher_is_better):
+    return {"value": round(value, 4), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _random_grid(rng, fill=0.6):
+    """Zufälliges Spielbrett mit Kacheln bis 2048."""
+    return [[2 ** rng.randint(1, 11) if rng.random() < fill else 0 for _ in range(4)] for _ in range(4)]
+
+
+def bench_engine(game, rng, quick):
+    """Durchsatz von process_line und compute_move auf zufälligen Brettern."""
+    count = 2000 if quick else 20000
+    grids = [_random_grid(rng) for _ in range(count // 4)]
+    lines = [row for grid in grids for row in grid]
+
+    def run_lines():
+        for line in lines:
+            game.process_line(line)
+
+    def run_moves():
+        for n, grid in enumerate(grids):
+            game.grid = grid
+            game.sync_board()  # Leer-Maske und Merge-Flag passend zum neuen Brett
+            game.compute_move(n % 4)
+
+    return {
+        "process_line": _result(len(lines) / _timed(run_lines, 3), "lines/s", True),
+        "compute_move": _result(len(grids) / _timed(run_moves, 3), "moves/s", True),
+    }
+
+
+def bench_games(game, seed, quick):
+    """Komplette Spiele mit der Autoplay-Strategie (ohne Animationen)."""
+    games = 5 if quick else 30
+    moves = 0
+
+    def run_games():
+        nonlocal moves
+        random.seed(seed)  # Jede Wiederholung spielt dieselben Partien
+        moves = 0
+        for _ in range(games):
+            game.reset_game()
+            game.total_moves = 0
+            while not game.game_over:
+                game.auto_move(instant=True)
+            moves += game.total_moves
+
+    elapsed = _timed(run_games, 3)
+    return {
+        "auto_move_games": _result(games / elapsed, "games/s", True),
+        "auto_move_moves": _result(moves / elapsed, "moves/s", True),
+    }
+
+
+def bench_grid_sizes(seed, quick, sizes=(6, 8)):
+    """Autoplay-Züge pro Sekunde auf größeren Feldern (Spiele dort dauern sehr lange, daher feste Zugzahl)."""
+    count = 2000 if quick else 20000
+    results = {}
+    for size in sizes:
+        game = Game2048(grid_size=size)
+
+        def run_moves():
+            random.seed(seed)
+            game.reset_game()
+            for _ in range(count):
+                if game.game_over:
+                    game.reset_game()
+                elif game.game_won and not game.continue_after_win:
+                    game.continue_game()
+                game.auto_move(instant=True)
+
+        results[f"auto_move_moves_{size}x{size}"] = _result(count / _timed(run_moves, 3), "moves/s", True)
+    return results
+
+
+class _Snapshot:
+    """Minimales Spielobjekt für choose_action (braucht nur `grid`)."""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+
+def bench_ai(rng, quick):
+    """Latenz von AI2048.choose_action + update_q_table pro Zug."""
+    count = 1000 if quick else 10000
+    ai = AI2048(load=False, exploration_rate=0.1)
+    grids = [_random_grid(rng) for _ in range(count + 1)]
+    states = [ai.get_state(grid) for grid in grids]
+    snapshots = [_Snapshot(grid) for grid in grids]
+
+    latencies = []
+    for n in range(count):
+        start = time.perf_counter()
+        action = ai.choose_action(snapshots[n])
+        ai.update_q_table(states[n], action, 4, states[n + 1])
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "ai_step_p50": _result(latencies[len(latencies) // 2] * 1e6, "us", False),
+        "ai_step_p95": _result(latencies[int(len(latencies) * 0.95)] * 1e6, "us", False),
+    }
+
+
+def bench_model_io(seed, quick, repeat=3):
+    """save_model/load_model in Abhängigkeit von der Größe der Q-Tabelle (jeweils in einem leeren Verzeichnis)."""
+    sizes = (1000, 10000) if quick else (1000, 10000, 100000)
+    results = {}
+    for size in sizes:
+        save_times, load_times = [], []
+        for _ in range(repeat):
+            rng = np.random.default_rng(seed)
+            with _scratch_dir():
+                ai = AI2048(load=False, max_entries=None)
+                keys = np.unique(rng.integers(0, 2 ** 63, size=size, dtype=np.uint64)).tolist()
+                for key in keys:
+                    ai.q_table[key] = rng.random(4)
+                start = time.perf_counter()
+                ai.save_model()
+                save_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                AI2048(load=True, max_entries=None)
+                load_times.append(time.perf_counter() - start)
+        results[f"save_model_{size}"] = _result(min(save_times) * 1e3, "ms", False)
+        results[f"load_model_{size}"] = _result(min(load_times) * 1e3, "ms", False)
+    return results
+
+
+def bench_draw(game, seed, quick):
+    """Frame-Zeit von Game2048.draw auf einer Offscreen-Surface (komplett und inkrementell)."""
+    frames = 200 if quick else 1000
+    screen = pygame.display.set_mode(game.config.WINDOW_SIZE)
+    random.seed(seed)
+    game.reset_game()
+    game.invalidate()
+    full, incremental = [], []
+    for n in range(frames):
+        if not game.moving:
+            game.auto_move()
+            if game.game_over:
+                game.reset_game()
+        game.update(1 / 60)
+
+        start = time.perf_counter()
+        game.draw(screen)
+        incremental.append(time.perf_counter() - start)
+
+        game.invalidate()
+        start = time.perf_counter()
+        game.draw(screen)
+        full.append(time.perf_counter() - start)
+    return {
+        "draw_full": _result(statistics.median(full) * 1e3, "ms", False),
+        "draw_incremental": _result(statistics.median(incremental) * 1e3, "ms", False),
+    }
+
+
+def run(seed=0, quick=False):
+    """Führt alle Benchmarks aus und gibt {Name: Ergebnis} zurück."""
+    rng = random.Random(seed)
+    np.random.seed(seed)
+    results = {}
+    with _scratch_dir():
+        random.seed(seed)
+        game = Game2048()
+        game.ai = AI2048(load=False)
+        results.update(bench_engine(game, rng, quick))
+        results.update(bench_games(game, seed, quick))
+        results.update(bench_grid_sizes(seed, quick))
+        results.update(bench_ai(rng, quick))
+        results.update(bench_draw(game, seed, quick))
+    results.update(bench_model_io(seed, quick))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Vergleicht mit einer Baseline. Gibt Zeilen (Name, alt, neu, Änderung, Regression) zurück;
+    die Änderung ist positiv, wenn es schneller wurde.
+    """
+    rows = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            rows.append((name, None, result["value"], None, False))
+            continue
+        if result["higher_is_better"]:
+            change = result["value"] / old["value"] - 1
+        else:
+            change = old["value"] / result["value"] - 1 if result["value"] else 0.0
+        rows.append((name, old["value"], result["value"], change, change < -threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks für Engine, KI und Renderer")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für alle Zufallsgeneratoren")
+    parser.add_argument("--quick", action="store_true", help="Kleinere Läufe (für schnelle Checks)")
+    parser.add_argument("--out", default="benchmark.json", help="Ausgabedatei für die Ergebnisse")
+    parser.add_argument("--baseline", default="benchmarks/baseline.json", help="Gespeicherte Vergleichswerte")
+    parser.add_argument("--save-baseline", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Erlaubte Verschlechterung (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    pygame.init()
+    results = run(seed=args.seed, quick=args.quick)
+    report = {
+        "meta": {
+            "seed": args.seed,
+            "quick": args.quick,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Ergebnisse gespeichert als {args.out}")
+
+    regressions = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("quick") != args.quick:
+            print("⚠️ Baseline wurde mit anderer Laufgröße (--quick) erstellt, Werte sind nur bedingt vergleichbar")
+        for name, old, new, change, regression in compare(results, baseline["results"], args.threshold):
+            unit = results[name]["unit"]
+            if change is None:
+                print(f"   {name:<20} {new:>12.2f} {unit:<8} (neu)")
+                continue
+            mark = "⚠️ " if regression else "✅"
+            print(f"{mark} {name:<20} {old:>12.2f} -> {new:>12.2f} {unit:<8} {change:+.1%}")
+            regressions += regression
+    else:
+        for name, result in results.items():
+            print(f"   {name:<20} {result['value']:>12.2f} {result['unit']}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline gespeichert als {args.baseline}")
+
+    pygame.quit()
+    if regressions:
+        print(f"⚠️ {regressions} Regression(en) gegenüber {args.baseline}")
+        if not args.save_baseline:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
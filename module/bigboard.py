@@ -0,0 +1,42 @@
+from hashlib import blake2b
+from itertools import chain
+
+# Zustandsschlüssel für Bretter größer als 4x4, die nicht in ein 64-Bit-Bitboard passen:
+# das Brett wird als Folge von Exponenten-Bytes gepackt (ein Byte pro Zelle, zeilenweise) und
+# über alle acht Symmetrien kanonisiert. Als Schlüssel der Q-Tabelle dient ein 64-Bit-Hash
+# der kanonischen Bytes. Die Symmetrie-Indizes entsprechen denen von bitboard
+# (Bit 0 = mirror, Bit 1 = flip, Bit 2 = transpose), bitboard.ACTION_TO_CANON gilt also auch hier.
+
+
+def exponents(grid):
+    """Exponenten des Rasters als Liste von Zeilen (0 = leer, 1 = 2, 2 = 4, ...)."""
+    return [[value.bit_length() - 1 if value else 0 for value in row] for row in grid]
+
+
+def pack(rows):
+    """Packt Zeilen von Exponenten in Bytes."""
+    return bytes(chain.from_iterable(rows))
+
+
+def symmetries(grid):
+    """Alle acht symmetrischen Varianten als gepackte Bytes (Index = Symmetrie)."""
+    rows = exponents(grid)
+    mirrored = [row[::-1] for row in rows]
+    variants = [rows, mirrored, rows[::-1], mirrored[::-1]]
+    variants += [list(zip(*v)) for v in variants]  # Transposition zuletzt angewendet
+    return [pack(v) for v in variants]
+
+
+def key(packed):
+    """64-Bit-Schlüssel der gepackten Bytes (stabil über Programmstarts hinweg)."""
+    return int.from_bytes(blake2b(packed, digest_size=8).digest(), "little")
+
+
+def canonical(grid):
+    """
+    Kanonische Form über alle acht Symmetrien (kleinste Byte-Folge).
+    Gibt (64-Bit-Schlüssel, Symmetrie-Index) zurück – wie bitboard.canonical.
+    """
+    variants = symmetries(grid)
+    best = min(variants)
+    return key(best), variants.index(best)
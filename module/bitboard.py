@@ -0,0 +1,296 @@
+import random
+
+import numpy as np
+
+# 64-Bit-Bitboard für das 4x4-Spielfeld.
+# Jede Zelle belegt 4 Bit und speichert den log2-Exponenten der Kachel (0 = leer, 1 = 2, 2 = 4, ...).
+# Zeile i liegt in den Bits 16*i .. 16*i+15, Spalte j im Nibble j der Zeile
+# (Spalte 0 = niederwertigstes Nibble). Der höchste darstellbare Exponent ist 15 (32768).
+# Exakt wie engine.process_line rechnet das Bitboard daher nur, solange keine Kachel ≥ 32768 liegt:
+# zwei 32768er verschmelzen im Nibble nicht, 65536 passt nicht hinein. Das Spiel prüft das mit
+# fits() und weicht sonst auf die Listen-Engine aus; die Headless-Simulationen (Engine2048, vecenv)
+# laufen nur auf dem Bitboard und behandeln 32768 als größte Kachel.
+#
+# Geschwindigkeit (gemessen, CPython 3.11): move() braucht horizontal ca. 0,55 µs, vertikal wegen der
+# Transposition ca. 1,1 µs – gegenüber ca. 21–39 µs für Game2048.compute_move etwa 20- bis 40-mal schneller,
+# nicht 50-mal. Lagetabellen, die Zeile und Punkte in einem Nachschlagen liefern, brachten nur ~20 % bei
+# ~12 MB pro Richtung; den Rest bestimmen Aufruf- und Ganzzahl-Overhead des Interpreters.
+
+ROW_MASK = 0xFFFF
+MAX_EXPONENT = 15
+MAX_TILE = 1 << MAX_EXPONENT
+
+
+def _reverse_row(row):
+    """Dreht die Reihenfolge der vier Nibbles einer Zeile um."""
+    return ((row & 0xF) << 12) | ((row & 0xF0) << 4) | ((row >> 4) & 0xF0) | (row >> 12)
+
+
+def _spread_column(row):
+    """Verteilt die vier Nibbles einer Zeile auf eine Spalte (Nibble i -> Zeile i)."""
+    return (row & 0xF) | ((row & 0xF0) << 12) | ((row & 0xF00) << 24) | ((row & 0xF000) << 36)
+
+
+def _build_tables():
+    """
+    Berechnet die Zeilentabellen für alle 65.536 möglichen Zeilen.
+    Vektorisiert über alle Zeilen gleichzeitig – eine Python-Schleife pro Zeile kostete beim Import ~0,3 s.
+    Gibt (ROW_LEFT, ROW_RIGHT, ROW_SCORE, COL_UP, COL_DOWN, ROW_REVERSE) als Listen zurück.
+    """
+    rows = np.arange(65536, dtype=np.uint64)
+    cells = ((rows[:, None] >> (np.arange(4, dtype=np.uint64) * 4)) & 0xF).astype(np.int64)
+
+    # Nicht-leere Zellen stabil nach links schieben
+    order = np.argsort(cells == 0, axis=1, kind="stable")
+    line = np.take_along_axis(cells, order, axis=1)
+
+    # Von links nach rechts zusammenfassen; eine entstandene Kachel wird im selben Zug nicht erneut verschmolzen.
+    # Zwei 32768er können im Nibble nicht zusammengefasst werden.
+    score = np.zeros(65536, dtype=np.int64)
+    for j in range(3):
+        merge = (line[:, j] != 0) & (line[:, j] == line[:, j + 1]) & (line[:, j] < MAX_EXPONENT)
+        line[merge, j] += 1
+        score[merge] += 1 << line[merge, j]
+        line[merge, j + 1:] = np.concatenate([line[merge, j + 2:], np.zeros((merge.sum(), 1), dtype=np.int64)], axis=1)
+
+    left = (line.astype(np.uint64) << (np.arange(4, dtype=np.uint64) * 4)).sum(axis=1, dtype=np.uint64)
+    reverse = _reverse_row(rows)
+    right = np.empty_like(left)
+    right[reverse] = _reverse_row(left)
+    return (left.tolist(), right.tolist(), score.tolist(),
+            _spread_column(left).tolist(), _spread_column(right).tolist(), reverse.tolist())
+
+
+# COL_UP/COL_DOWN: Ergebnis einer Spaltenbewegung direkt in Spaltenlage (spart das Zurücktransponieren)
+ROW_LEFT, ROW_RIGHT, ROW_SCORE, COL_UP, COL_DOWN, ROW_REVERSE = _build_tables()
+
+
+def transpose(board):
+    """Spiegelt das Brett an der Hauptdiagonalen (Zeilen werden zu Spalten)."""
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def mirror(board, _rev=ROW_REVERSE):
+    """Spiegelt das Brett horizontal (Spalte j -> 3-j)."""
+    return (_rev[board & 0xFFFF] | (_rev[(board >> 16) & 0xFFFF] << 16)
+            | (_rev[(board >> 32) & 0xFFFF] << 32) | (_rev[board >> 48] << 48))
+
+
+def flip(board):
+    """Spiegelt das Brett vertikal (Zeile i -> 3-i)."""
+    return (((board & 0xFFFF) << 48) | (((board >> 16) & 0xFFFF) << 32)
+            | (((board >> 32) & 0xFFFF) << 16) | (board >> 48))
+
+
+# Die acht Symmetrien des Bretts: Bit 0 = mirror, Bit 1 = flip, Bit 2 = transpose (in dieser Reihenfolge).
+# Richtungen werden entsprechend umgerechnet (0=Up, 1=Right, 2=Down, 3=Left).
+_MIRROR_ACTION = (0, 3, 2, 1)
+_FLIP_ACTION = (2, 1, 0, 3)
+_TRANSPOSE_ACTION = (3, 2, 1, 0)
+
+
+def _symmetry_actions(sym):
+    actions = []
+    for a in range(4):
+        if sym & 1:
+            a = _MIRROR_ACTION[a]
+        if sym & 2:
+            a = _FLIP_ACTION[a]
+        if sym & 4:
+            a = _TRANSPOSE_ACTION[a]
+        actions.append(a)
+    return tuple(actions)
+
+
+# ACTION_TO_CANON[sym][a]: Richtung a im Originalbrett -> Richtung im transformierten Brett
+ACTION_TO_CANON = tuple(_symmetry_actions(sym) for sym in range(8))
+# CANON_TO_ACTION[sym][a]: Umkehrung davon
+CANON_TO_ACTION = tuple(tuple(row.index(a) for a in range(4)) for row in ACTION_TO_CANON)
+
+
+def symmetries(board, _rev=ROW_REVERSE):
+    """
+    Gibt alle acht symmetrischen Varianten des Bretts zurück (Index = Symmetrie).
+    Nur eine Transposition nötig: transpose(mirror(b)) = flip(transpose(b)) usw.
+    """
+    variants = []
+    for b in (board, transpose(board)):
+        r0 = b & 0xFFFF
+        r1 = (b >> 16) & 0xFFFF
+        r2 = (b >> 32) & 0xFFFF
+        r3 = b >> 48
+        m0, m1, m2, m3 = _rev[r0], _rev[r1], _rev[r2], _rev[r3]
+        variants.append(b)                                          # b
+        variants.append(m0 | (m1 << 16) | (m2 << 32) | (m3 << 48))  # mirror(b)
+        variants.append(r3 | (r2 << 16) | (r1 << 32) | (r0 << 48))  # flip(b)
+        variants.append(m3 | (m2 << 16) | (m1 << 32) | (m0 << 48))  # flip(mirror(b))
+    # Für die transponierte Hälfte: T(m) = flip(T), T(f) = mirror(T), T(mf) = flip(mirror(T))
+    variants[5], variants[6] = variants[6], variants[5]
+    return variants
+
+
+def canonical(board):
+    """
+    Kanonische Form über alle acht Symmetrien (kleinstes Bitboard).
+    Gibt (kanonisches Brett, Symmetrie-Index) zurück.
+    """
+    variants = symmetries(board)
+    best = min(variants)
+    return best, variants.index(best)
+
+
+# Tabelle je Richtung: 0=Up, 1=Right, 2=Down, 3=Left
+_MOVE_TABLES = (COL_UP, ROW_RIGHT, COL_DOWN, ROW_LEFT)
+
+
+def move(board, direction, _tables=_MOVE_TABLES, _score=ROW_SCORE):
+    """
+    Führt einen Zug auf dem Bitboard aus.
+    direction: 0=Up, 1=Right, 2=Down, 3=Left
+    Gibt (neues Brett, Punkte) zurück.
+    """
+    table = _tables[direction]
+    if direction & 1:  # Horizontal: Zeilen direkt nachschlagen
+        r0 = board & 0xFFFF
+        r1 = (board >> 16) & 0xFFFF
+        r2 = (board >> 32) & 0xFFFF
+        r3 = board >> 48
+        return (table[r0] | (table[r1] << 16) | (table[r2] << 32) | (table[r3] << 48),
+                _score[r0] + _score[r1] + _score[r2] + _score[r3])
+
+    # Vertikal: transponieren (inline, spart den Funktionsaufruf) und Spaltentabellen nutzen
+    a = (board & 0xF0F00F0FF0F00F0F) | ((board & 0x0000F0F00000F0F0) << 12) | ((board & 0x0F0F00000F0F0000) >> 12)
+    t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    r0 = t & 0xFFFF
+    r1 = (t >> 16) & 0xFFFF
+    r2 = (t >> 32) & 0xFFFF
+    r3 = t >> 48
+    return (table[r0] | (table[r1] << 4) | (table[r2] << 8) | (table[r3] << 12),
+            _score[r0] + _score[r1] + _score[r2] + _score[r3])
+
+
+def all_moves(board, _score=ROW_SCORE):
+    """
+    Berechnet alle vier Züge auf einmal (eine Transposition, gemeinsame Zeilenschlüssel).
+    Gibt eine Liste [(neues Brett, Punkte)] in der Reihenfolge Up, Right, Down, Left zurück.
+    """
+    left, right, up, down = ROW_LEFT, ROW_RIGHT, COL_UP, COL_DOWN
+    r0 = board & 0xFFFF
+    r1 = (board >> 16) & 0xFFFF
+    r2 = (board >> 32) & 0xFFFF
+    r3 = board >> 48
+    h_points = _score[r0] + _score[r1] + _score[r2] + _score[r3]
+
+    a = (board & 0xF0F00F0FF0F00F0F) | ((board & 0x0000F0F00000F0F0) << 12) | ((board & 0x0F0F00000F0F0000) >> 12)
+    t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    c0 = t & 0xFFFF
+    c1 = (t >> 16) & 0xFFFF
+    c2 = (t >> 32) & 0xFFFF
+    c3 = t >> 48
+    v_points = _score[c0] + _score[c1] + _score[c2] + _score[c3]
+
+    return [
+        (up[c0] | (up[c1] << 4) | (up[c2] << 8) | (up[c3] << 12), v_points),
+        (right[r0] | (right[r1] << 16) | (right[r2] << 32) | (right[r3] << 48), h_points),
+        (down[c0] | (down[c1] << 4) | (down[c2] << 8) | (down[c3] << 12), v_points),
+        (left[r0] | (left[r1] << 16) | (left[r2] << 32) | (left[r3] << 48), h_points),
+    ]
+
+
+def legal_moves(board):
+    """Gibt alle Richtungen zurück, die das Brett verändern."""
+    return [d for d, (new_board, _) in enumerate(all_moves(board)) if new_board != board]
+
+
+def empty_mask(board):
+    """Maske mit gesetztem Bit 4*k für jede leere Zelle k."""
+    x = board | (board >> 1)
+    x |= x >> 2
+    return ~x & 0x1111111111111111
+
+
+def is_game_over(board):
+    """Überprüft, ob keine Züge mehr möglich sind."""
+    if empty_mask(board):
+        return False
+    for new_board, _ in all_moves(board):
+        if new_board != board:
+            return False
+    return True
+
+
+def empty_positions(board):
+    """Liefert die Indizes (0-15, zeilenweise) aller leeren Zellen."""
+    mask = empty_mask(board)
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append((low.bit_length() - 1) >> 2)
+        mask ^= low
+    return positions
+
+
+def count_empty(board):
+    """Zählt die leeren Zellen."""
+    return empty_mask(board).bit_count()
+
+
+def max_exponent(board):
+    """Gibt den größten Exponenten auf dem Brett zurück."""
+    best = 0
+    while board:
+        e = board & 0xF
+        if e > best:
+            best = e
+        board >>= 4
+    return best
+
+
+def spawn(board, rng=random):
+    """Setzt eine 2 (90%) oder 4 (10%) auf eine zufällige leere Zelle."""
+    mask = empty_mask(board)
+    if not mask:
+        return board
+    # k-te leere Zelle direkt aus der Maske lesen
+    for _ in range(rng.randrange(mask.bit_count())):
+        mask &= mask - 1
+    shift = (mask & -mask).bit_length() - 1
+    exponent = 1 if rng.random() < 0.9 else 2
+    return board | (exponent << shift)
+
+
+def fits(grid):
+    """True, wenn das Raster auf dem Bitboard dieselben Züge ergibt wie mit engine.process_line."""
+    return all(value < MAX_TILE for row in grid for value in row)
+
+
+def from_grid(grid):
+    """Wandelt ein 4x4-Raster mit Kachelwerten in ein Bitboard um."""
+    board = 0
+    for i, row in enumerate(grid):
+        for j, value in enumerate(row):
+            if value:
+                exponent = value.bit_length() - 1
+                if exponent > MAX_EXPONENT:
+                    raise ValueError(f"Kachel {value} passt nicht in ein Bitboard")
+                board |= exponent << (4 * (4 * i + j))
+    return board
+
+
+def to_grid(board):
+    """Wandelt ein Bitboard zurück in ein 4x4-Raster mit Kachelwerten."""
+    grid = []
+    for i in range(4):
+        row = []
+        for j in range(4):
+            e = (board >> (4 * (4 * i + j))) & 0xF
+            row.append(1 << e if e else 0)
+        grid.append(row)
+    return grid
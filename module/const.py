@@ -1,7 +1,36 @@
 import pygame
+
+
+class FontTable(dict):
+    """
+    Fonts nach Name, erst beim ersten Zugriff per SysFont geladen – beim Start wird keine
+    Schriftsuche bezahlt, die noch niemand braucht.
+    """
+
+    def __init__(self, sizes):
+        super().__init__()
+        self.sizes = sizes  # Name -> Punktgröße
+
+    def __missing__(self, name):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = self[name] = pygame.font.SysFont('Arial', self.sizes[name])
+        return font
+
+
+_SHARED = {}  # Feldgröße -> gemeinsam genutzte GameConfig
+
+
+def shared_config(grid_size=4):
+    """Gibt die gemeinsame Konfiguration einer Feldgröße zurück (wird nur einmal erstellt)."""
+    config = _SHARED.get(grid_size)
+    if config is None:
+        config = _SHARED[grid_size] = GameConfig(grid_size)
+    return config
+
+
 class GameConfig:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, grid_size=4):
         
         # Farben
         self.BACKGROUND_COLOR = (187, 173, 160)
@@ -31,26 +60,37 @@ class GameConfig:
         }
 
         # Spielkonstanten
-        self.GRID_SIZE = 4
-        self.CELL_SIZE = 100
-        self.CELL_MARGIN = 10
+        self.GRID_SIZE = grid_size  # 4 bis 8; größere Felder bekommen kleinere Zellen bei gleicher Fenstergröße
+        self.BOARD_WIDTH = 440      # Breite des Spielfelds ohne Rand (4 * (100 + 10))
+        self.CELL_MARGIN = max(4, 40 // self.GRID_SIZE)
+        self.CELL_SIZE = self.BOARD_WIDTH // self.GRID_SIZE - self.CELL_MARGIN
         self.GRID_PADDING = 10
         self.WINDOW_WIDTH = self.GRID_SIZE * (self.CELL_SIZE + self.CELL_MARGIN) + self.GRID_PADDING * 2
         self.WINDOW_HEIGHT = self.WINDOW_WIDTH + 50
         self.WINDOW_SIZE = (self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
 
+        # KI-Modell für den Intelligent Mode: "qtable" (AI2048) oder "ntuple" (NTupleAI)
+        self.AI_MODEL = "qtable"
+        self.Q_TABLE_MAX_ENTRIES = 500000  # Obergrenze der Q-Tabelle im Arbeitsspeicher
+        self.Q_TABLE_EVICTION = "lru"      # "lru" oder "visits"
+        self.REPLAY_CAPACITY = 100000      # Übergänge im Replay-Puffer (None = Lernen direkt pro Zug)
+        self.REPLAY_BATCH_SIZE = 32        # Übergänge pro Minibatch
+
+        # Aufzeichnung aller Spiele (ein Byte pro Zug), auswertbar mit `python -m module.recording`
+        self.RECORD_GAMES = True
+        self.RECORDING_PATH = "app_data/games.rec"
+
         # Animationen
         self.MOVE_ANIMATION_DURATION = 0.1  # Dauer der Bewegungsanimation in Sekunden
         self.MERGE_ANIMATION_DURATION = 0.2  # Dauer der Merge-Animation in Sekunden
         self.SPAWN_ANIMATION_DURATION = 0.15  # Dauer der Spawn-Animation in Sekunden
 
-        # Fonts
-        self.font = {
-            'small': pygame.font.SysFont('Arial', 36),
-            'medium': pygame.font.SysFont('Arial', 48),
-            'large': pygame.font.SysFont('Arial', 60),
-            'extra_small': pygame.font.SysFont('Arial', 24),
-        }
+        # Fonts (werden beim ersten Zugriff geladen)
+        font_sizes = {'small': 36, 'medium': 48, 'large': 60, 'extra_small': 24}
+        self.font = FontTable(font_sizes)
+        # Fonts der Kachelzahlen wachsen und schrumpfen mit der Zellgröße
+        scale = self.CELL_SIZE / 100
+        self.tile_font = FontTable({name: round(size * scale) for name, size in font_sizes.items()}) if scale != 1 else self.font
         #Text_fonts
         self.TEXT_COLORS = {
             2: (119, 110, 101),
@@ -0,0 +1,299 @@
+import random
+from module import bitboard
+
+# Reine Spiellogik für 2048 – kommt ohne pygame und ohne Animationszustand aus,
+# damit Training und Auswertung sehr viele Züge pro Sekunde simulieren können.
+
+DIRECTIONS = (0, 1, 2, 3)  # 0=Up, 1=Right, 2=Down, 3=Left
+
+
+def process_line(line):
+    """
+    Schiebt eine Zeile (als Liste von Zahlen) nach links und fasst gleiche Kacheln zusammen.
+    Gibt (neue Linie, Punkte) zurück.
+    """
+    non_zero = [val for val in line if val != 0]
+    new_line = []
+    points = 0
+
+    i = 0
+    while i < len(non_zero):
+        if i < len(non_zero) - 1 and non_zero[i] == non_zero[i + 1]:
+            merged_value = non_zero[i] * 2
+            points += merged_value
+            new_line.append(merged_value)
+            i += 2
+        else:
+            new_line.append(non_zero[i])
+            i += 1
+
+    # Fülle mit Nullen auf
+    new_line.extend([0] * (len(line) - len(new_line)))
+    return new_line, points
+
+
+_LINE_TABLE = {}  # Linie (Tupel) -> Ergebnis der Linksbewegung inkl. Animationsdaten
+LINE_TABLE_LIMIT = 1 << 18  # Obergrenze der gemerkten Linien (4er-Linien brauchen höchstens 18^4)
+
+
+def _slide_line(line):
+    """
+    Schiebt eine Linie nach links wie process_line und merkt sich dabei, welche Kachel wohin wandert.
+    Gibt (neue Linie, Punkte, Merge-Positionen, Bewegungen) zurück – Bewegungen als (Start, Ziel, Merge).
+    """
+    non_zero = [(val, idx) for idx, val in enumerate(line) if val != 0]
+    new_line = []
+    points = 0
+    merges = []
+    slides = []
+
+    i = 0
+    while i < len(non_zero):
+        target = len(new_line)
+        if i < len(non_zero) - 1 and non_zero[i][0] == non_zero[i + 1][0]:
+            # Bei einem Merge wandern beide Kacheln zum Ziel
+            new_line.append(non_zero[i][0] * 2)
+            points += non_zero[i][0] * 2
+            merges.append(target)
+            slides.append((non_zero[i][1], target, True))
+            slides.append((non_zero[i + 1][1], target, True))
+            i += 2
+        else:
+            new_line.append(non_zero[i][0])
+            slides.append((non_zero[i][1], target, False))
+            i += 1
+
+    new_line.extend([0] * (len(line) - len(new_line)))
+    return tuple(new_line), points, tuple(merges), tuple(slides)
+
+
+def line_move(line):
+    """
+    Linksbewegung einer Linie aus der Tabelle; jede Linie wird nur beim ersten Auftreten berechnet.
+    Gibt (neue Linie, Punkte, Merge-Positionen, Bewegungen) zurück (siehe _slide_line).
+    """
+    key = tuple(line)
+    entry = _LINE_TABLE.get(key)
+    if entry is None:
+        if len(_LINE_TABLE) >= LINE_TABLE_LIMIT:
+            _LINE_TABLE.clear()
+        entry = _LINE_TABLE[key] = _slide_line(key)
+    return entry
+
+
+_SPREAD = {}  # Feldgröße -> Tabelle, die eine Linienmaske auf eine Spalte der Zellmaske verteilt
+
+
+def column_spread(size):
+    """Tabelle: Bit i einer Linienmaske -> Bit i*size (Zeile i der Spalte 0) der Zellmaske."""
+    table = _SPREAD.get(size)
+    if table is None:
+        table = _SPREAD[size] = [sum(1 << (i * size) for i in range(size) if m >> i & 1) for m in range(1 << size)]
+    return table
+
+
+def line_occupancy(entry, size, reverse):
+    """Belegte Zellen einer Linie nach dem Zug als Bitmaske (Bit = Index in der Linie)."""
+    n = len(entry[3]) - len(entry[2])  # Jeder Merge macht aus zwei Kacheln eine
+    bits = (1 << n) - 1
+    return bits << (size - n) if reverse else bits
+
+
+def move_grid(grid, direction, occupied=False, _table=_LINE_TABLE):
+    """
+    Berechnet das Raster nach einem Zug ohne Animationsdaten.
+    direction: 0=Up, 1=Right, 2=Down, 3=Left
+    Gibt (neues Raster, Punkte, moved) zurück; mit occupied=True zusätzlich die Bitmaske
+    der belegten Zellen (Bit i*size+j), direkt aus den Tabelleneinträgen ohne weiteren Scan.
+    """
+    size = len(grid)
+    total_points = 0
+    reverse = direction in (1, 2)  # Rechts/Runter: Linie gespiegelt nachschlagen
+    horizontal = direction in (3, 1)
+    mask = 0
+    spread = column_spread(size) if occupied and not horizontal else None
+
+    if horizontal:
+        lines = grid
+    else:  # Vertikal: Spalten als Linien
+        lines = list(zip(*grid))
+
+    new_lines = []
+    for k, line in enumerate(lines):
+        key = tuple(line[::-1]) if reverse else tuple(line)
+        entry = _table.get(key) or line_move(key)
+        total_points += entry[1]
+        new_lines.append(entry[0][::-1] if reverse else entry[0])
+        if occupied:
+            bits = line_occupancy(entry, size, reverse)
+            mask |= bits << (k * size) if horizontal else spread[bits] << k
+
+    if horizontal:
+        new_grid = [list(line) for line in new_lines]
+    else:
+        new_grid = [list(row) for row in zip(*new_lines)]
+
+    moved = new_grid != grid
+    if occupied:
+        return new_grid, total_points, moved, mask
+    return new_grid, total_points, moved
+
+
+def can_move(grid, direction, _table=_LINE_TABLE):
+    """Prüft über die Linientabelle, ob ein Zug das Raster verändert (bricht bei der ersten bewegten Linie ab)."""
+    reverse = direction in (1, 2)
+    lines = grid if direction in (3, 1) else zip(*grid)
+    for line in lines:
+        key = tuple(line[::-1]) if reverse else tuple(line)
+        entry = _table.get(key) or line_move(key)
+        if entry[0] != key:
+            return True
+    return False
+
+
+def afterstates(grid, _table=_LINE_TABLE):
+    """
+    Alle vier Züge in einem Aufruf: Liste von (neues Raster, Punkte, moved) je Richtung.
+    Zeilen und Spalten werden dafür nur einmal in Tupel umgewandelt.
+    """
+    rows = [tuple(row) for row in grid]
+    columns = list(zip(*grid))
+    results = []
+    for direction in DIRECTIONS:
+        reverse = direction in (1, 2)
+        lines = rows if direction in (3, 1) else columns
+        total_points = 0
+        new_lines = []
+        for line in lines:
+            key = line[::-1] if reverse else line
+            entry = _table.get(key) or line_move(key)
+            total_points += entry[1]
+            new_lines.append(entry[0][::-1] if reverse else entry[0])
+        if lines is rows:
+            new_grid = [list(line) for line in new_lines]
+        else:
+            new_grid = [list(row) for row in zip(*new_lines)]
+        results.append((new_grid, total_points, new_lines != lines))
+    return results
+
+
+def greedy_move(grid):
+    """Gültiger Zug mit den meisten Punkten (Ausweichstrategie ohne Bitboard) oder None."""
+    moves = [(points, -direction) for direction, (_, points, moved) in enumerate(afterstates(grid)) if moved]
+    return -max(moves)[1] if moves else None
+
+
+def empty_cells(grid):
+    """Liefert alle leeren Zellen als Liste von (Zeile, Spalte)."""
+    size = len(grid)
+    return [(i, j) for i in range(size) for j in range(size) if grid[i][j] == 0]
+
+
+def occupancy(grid):
+    """Bitmaske der belegten Zellen (Bit i*size+j) – ein Scan, z.B. nach einem Neustart."""
+    size = len(grid)
+    return sum(1 << (i * size + j) for i in range(size) for j in range(size) if grid[i][j])
+
+
+def has_merge(grid):
+    """True, wenn zwei benachbarte Zellen denselben Wert haben (Zug ohne leere Zelle möglich)."""
+    size = len(grid)
+    for i in range(size):
+        row = grid[i]
+        for j in range(size - 1):
+            if row[j] and row[j] == row[j + 1]:
+                return True
+    for i in range(size - 1):
+        row, below = grid[i], grid[i + 1]
+        for j in range(size):
+            if row[j] and row[j] == below[j]:
+                return True
+    return False
+
+
+def is_game_over(grid):
+    """Überprüft, ob keine Züge mehr möglich sind."""
+    size = len(grid)
+    for i in range(size):
+        for j in range(size):
+            value = grid[i][j]
+            if value == 0:
+                return False
+            if j < size - 1 and value == grid[i][j + 1]:
+                return False
+            if i < size - 1 and value == grid[i + 1][j]:
+                return False
+    return True
+
+
+def max_tile(grid):
+    """Gibt den höchsten Kachelwert des Rasters zurück."""
+    return max(max(row) for row in grid)
+
+
+def auto_move_policy(board):
+    """
+    Feste Strategie von Game2048.auto_move auf dem Bitboard:
+    Rechts, Unten (nur bei voller rechter Spalte), Hoch, Links.
+    Gibt die Richtung oder None zurück, wenn kein Zug möglich ist.
+    """
+    if bitboard.move(board, 1)[0] != board:
+        return 1
+    right_column_full = all((board >> (4 * (4 * i + 3))) & 0xF for i in range(4))
+    if right_column_full and bitboard.move(board, 2)[0] != board:
+        return 2
+    if bitboard.move(board, 0)[0] != board:
+        return 0
+    if bitboard.move(board, 3)[0] != board:
+        return 3
+    return None
+
+
+class Engine2048:
+    """
+    Headless-Spiel auf dem Bitboard: ein Aufruf von step() führt Zug und Spawn synchron aus.
+    Größte Kachel ist 32768 (zwei davon verschmelzen nicht, siehe bitboard).
+    """
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.reset()
+
+    @property
+    def grid(self):
+        """Raster mit Kachelwerten (für Code, der mit Listen arbeitet)."""
+        return bitboard.to_grid(self.board)
+
+    def reset(self):
+        """Startet ein neues Spiel mit zwei zufälligen Kacheln."""
+        self.board = bitboard.spawn(bitboard.spawn(0, self.rng), self.rng)
+        self.score = 0
+        self.moves = 0
+        self.game_over = False
+
+    @property
+    def best_tile(self):
+        """Höchster Kachelwert auf dem Brett."""
+        return 1 << bitboard.max_exponent(self.board)
+
+    def legal_moves(self):
+        """Gibt alle Richtungen zurück, die das Brett verändern."""
+        return bitboard.legal_moves(self.board)
+
+    def step(self, direction):
+        """
+        Führt einen Zug inklusive Spawn aus.
+        Gibt (moved, Punkte, game_over) zurück.
+        """
+        if self.game_over:
+            return False, 0, True
+
+        new_board, points = bitboard.move(self.board, direction)
+        if new_board == self.board:
+            return False, 0, False
+
+        self.board = bitboard.spawn(new_board, self.rng)
+        self.score += points
+        self.moves += 1
+        self.game_over = bitboard.is_game_over(self.board)
+        return True, points, self.game_over
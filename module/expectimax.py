@@ -0,0 +1,178 @@
+import time
+from module import bitboard, engine
+
+# Expectimax-Suche auf dem Bitboard: Max-Knoten für die Züge des Spielers,
+# Zufallsknoten für den Spawn (2 mit 90%, 4 mit 10% – wie in Game2048.add_new_tile).
+
+# Gewichte der Blattbewertung (je Zeile und Spalte vorberechnet)
+SCORE_LOST_PENALTY = 200000.0
+SCORE_MONOTONICITY_POWER = 4.0
+SCORE_MONOTONICITY_WEIGHT = 47.0
+SCORE_SUM_POWER = 3.5
+SCORE_SUM_WEIGHT = 11.0
+SCORE_MERGES_WEIGHT = 700.0
+SCORE_EMPTY_WEIGHT = 270.0
+
+_heuristic_table = None
+
+
+def _row_heuristic(row):
+    """Bewertet eine einzelne Zeile: leere Felder, Merge-Möglichkeiten, Monotonie und Summe."""
+    line = [(row >> (4 * j)) & 0xF for j in range(4)]
+    total = 0.0
+    empty = 0
+    merges = 0
+    prev = 0
+    counter = 0
+    for rank in line:
+        total += rank ** SCORE_SUM_POWER
+        if rank == 0:
+            empty += 1
+        else:
+            if prev == rank:
+                counter += 1
+            elif counter > 0:
+                merges += 1 + counter
+                counter = 0
+            prev = rank
+    if counter > 0:
+        merges += 1 + counter
+
+    mono_left = 0.0
+    mono_right = 0.0
+    for j in range(1, 4):
+        if line[j - 1] > line[j]:
+            mono_left += line[j - 1] ** SCORE_MONOTONICITY_POWER - line[j] ** SCORE_MONOTONICITY_POWER
+        else:
+            mono_right += line[j] ** SCORE_MONOTONICITY_POWER - line[j - 1] ** SCORE_MONOTONICITY_POWER
+
+    return (SCORE_LOST_PENALTY + SCORE_EMPTY_WEIGHT * empty + SCORE_MERGES_WEIGHT * merges
+            - SCORE_MONOTONICITY_WEIGHT * min(mono_left, mono_right) - SCORE_SUM_WEIGHT * total)
+
+
+def heuristic_table():
+    """Liefert die Heuristik-Tabelle für alle 65.536 Zeilen (wird beim ersten Aufruf berechnet)."""
+    global _heuristic_table
+    if _heuristic_table is None:
+        _heuristic_table = [_row_heuristic(row) for row in range(65536)]
+    return _heuristic_table
+
+
+def evaluate(board, table=None):
+    """Heuristische Bewertung eines Bretts über alle Zeilen und Spalten."""
+    table = table or heuristic_table()
+    t = bitboard.transpose(board)
+    return (table[board & 0xFFFF] + table[(board >> 16) & 0xFFFF]
+            + table[(board >> 32) & 0xFFFF] + table[board >> 48]
+            + table[t & 0xFFFF] + table[(t >> 16) & 0xFFFF]
+            + table[(t >> 32) & 0xFFFF] + table[t >> 48])
+
+
+class _SearchTimeout(Exception):
+    """Wird ausgelöst, wenn das Zeitbudget eines Zuges aufgebraucht ist."""
+
+
+class ExpectimaxAI:
+    """Expectimax-Spieler mit Transpositionstabelle, Wahrscheinlichkeits-Cutoff und adaptiver Tiefe."""
+
+    def __init__(self, time_budget=0.1, min_probability=0.0001, max_depth=3, table_limit=500000):
+        self.time_budget = time_budget          # Sekunden pro Entscheidung
+        self.min_probability = min_probability  # Pfade mit kleinerer Wahrscheinlichkeit werden nur bewertet
+        self.max_depth = max_depth
+        self.table_limit = table_limit          # Maximale Größe der Transpositionstabelle
+        self.transpositions = {}
+        self.last_depth = 0
+        self.last_nodes = 0
+        self._deadline = 0.0
+        self._nodes = 0
+        self._heuristic = heuristic_table()
+
+    def depth_for(self, board):
+        """Suchtiefe abhängig von der Anzahl leerer Felder (volle Bretter brauchen tiefere Suche)."""
+        empty = bitboard.count_empty(board)
+        if empty > 6:
+            depth = 1
+        elif empty > 3:
+            depth = 2
+        else:
+            depth = 3
+        return min(depth, self.max_depth)
+
+    def choose_action(self, game):
+        """
+        Wählt den Zug mit dem höchsten Erwartungswert für das aktuelle Raster.
+        Ab einer 32768er-Kachel rechnet das Bitboard nicht mehr exakt – dann gierig auf dem Raster.
+        """
+        grid = game.grid
+        if not bitboard.fits(grid):
+            return engine.greedy_move(grid)
+        return self.best_move(bitboard.from_grid(grid))
+
+    def best_move(self, board):
+        """
+        Iterative Vertiefung bis zur adaptiven Tiefe oder bis das Zeitbudget abläuft.
+        Gibt die Richtung oder None zurück, wenn kein Zug möglich ist.
+        """
+        candidates = [(d, new_board) for d, (new_board, _) in enumerate(bitboard.all_moves(board))
+                      if new_board != board]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0][0]
+
+        self._deadline = time.perf_counter() + self.time_budget
+        self._nodes = 0
+        if len(self.transpositions) > self.table_limit:
+            self.transpositions.clear()
+
+        best = candidates[0][0]
+        for depth in range(1, self.depth_for(board) + 1):
+            try:
+                values = [(self._chance(new_board, depth, 1.0), d) for d, new_board in candidates]
+            except _SearchTimeout:
+                break
+            best = max(values)[1]
+            self.last_depth = depth
+        self.last_nodes = self._nodes
+        return best
+
+    def _chance(self, board, depth, probability):
+        """Zufallsknoten: Mittelwert über alle möglichen Spawns."""
+        if depth <= 0 or probability < self.min_probability:
+            return evaluate(board, self._heuristic)
+
+        cached = self.transpositions.get(board)
+        if cached is not None and cached[0] >= depth:
+            return cached[1]
+
+        mask = bitboard.empty_mask(board)
+        count = mask.bit_count()
+        if count == 0:
+            return evaluate(board, self._heuristic)
+        probability /= count
+
+        total = 0.0
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            shift = low.bit_length() - 1
+            total += 0.9 * self._max(board | (1 << shift), depth, probability * 0.9)
+            total += 0.1 * self._max(board | (2 << shift), depth, probability * 0.1)
+        value = total / count
+
+        self.transpositions[board] = (depth, value)
+        return value
+
+    def _max(self, board, depth, probability):
+        """Max-Knoten: bester Zug des Spielers (0, wenn das Spiel verloren ist)."""
+        self._nodes += 1
+        if self._nodes & 0xFF == 0 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+        best = 0.0
+        for new_board, _ in bitboard.all_moves(board):
+            if new_board != board:
+                value = self._chance(new_board, depth - 1, probability)
+                if value > best:
+                    best = value
+        return best
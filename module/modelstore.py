@@ -0,0 +1,488 @@
+import heapq
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Binäres Modellformat für die Q-Tabelle:
+#   Header (64 Byte): Magic, Formatversion, Modellversion, Statistiken, Anzahl sortierter/aller Einträge
+#   Einträge (je 24 Byte): gepackter Zustand (uint64) + vier float32-Q-Werte
+# Die ersten `sorted_count` Einträge sind nach Schlüssel sortiert (Binärsuche direkt im memmap),
+# danach folgt ein unsortierter Anhang mit neuen Zuständen. Geänderte Einträge werden an Ort und
+# Stelle überschrieben, neue angehängt – die Datei wird nur beim gelegentlichen Kompaktieren neu geschrieben.
+
+MAGIC = b"Q2048MDL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQQ")
+HEADER_SIZE = 64
+RECORD_DTYPE = np.dtype([("key", "<u8"), ("q", "<f4", (4,))])
+
+
+class ModelFile:
+    """Q-Tabelle auf der Festplatte, gelesen über numpy.memmap (Startzeit unabhängig von der Modellgröße)."""
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly  # Nur lesend abbilden (z.B. in Trainings-Workern)
+        self.stats = {"version": 1, "games_played": 0, "best_score": 0, "best_tile": 0}
+        self.sorted_count = 0
+        self.count = 0
+        self._records = None
+        self._keys = None
+        self._tail_index = None  # (sortierte Schlüssel, Zeilen) des Anhangs, erst beim ersten Zugriff erstellt
+        self._lock = threading.RLock()  # Lesen im Spiel und Schreiben im Hintergrund nicht überlappen lassen
+        self._compacting = None  # Während des Kompaktierens: {Schlüssel: Q-Werte} der Zwischenzeit
+        if os.path.exists(path):
+            self._open()
+
+    def _open(self):
+        """Liest den Header und bildet die Einträge per memmap ab."""
+        with open(self.path, "rb") as f:
+            magic, fmt, version, games, best_score, best_tile, sorted_count, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{self.path} ist keine Modelldatei im Format {FORMAT_VERSION}")
+        self.stats = {"version": version, "games_played": games, "best_score": best_score, "best_tile": best_tile}
+        self.sorted_count = sorted_count
+        self.count = count
+        self._map()
+
+    def _map(self):
+        self._tail_index = None
+        if self.count == 0:
+            self._records = None
+            self._keys = None
+            return
+        self._records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r" if self.readonly else "r+", offset=HEADER_SIZE, shape=(self.count,))
+        self._keys = self._records["key"][:self.sorted_count]
+
+    def _tail(self):
+        """
+        Index des unsortierten Anhangs: sortierte Schlüssel und ihre Zeilen als numpy-Arrays.
+        Wird erst beim ersten Zugriff gebaut (das Öffnen bleibt unabhängig von der Modellgröße).
+        """
+        if self._tail_index is None:
+            tail_keys = np.array(self._records["key"][self.sorted_count:])
+            order = np.argsort(tail_keys, kind="stable")
+            self._tail_index = (tail_keys[order], order + self.sorted_count)
+        return self._tail_index
+
+    def __len__(self):
+        return self.count
+
+    def _row(self, key):
+        """Gibt die Zeile eines Schlüssels zurück oder None (Binärsuche im sortierten Bereich, dann im Anhang)."""
+        key = np.uint64(key)
+        if self.sorted_count:
+            pos = int(np.searchsorted(self._keys, key))
+            if pos < self.sorted_count and self._keys[pos] == key:
+                return pos
+        if self.count > self.sorted_count:
+            tail_keys, tail_rows = self._tail()
+            pos = int(np.searchsorted(tail_keys, key))
+            if pos < len(tail_keys) and tail_keys[pos] == key:
+                return int(tail_rows[pos])
+        return None
+
+    def get(self, key):
+        """Liest die Q-Werte eines Zustands (Kopie) oder None, wenn er unbekannt ist."""
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                return None
+            return np.array(self._records["q"][row], dtype=np.float64)
+
+    def _rows(self, keys):
+        """Zeilen vieler Schlüssel auf einmal (-1 für unbekannte): je eine Binärsuche pro Bereich."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if self.sorted_count:
+            pos = np.minimum(np.searchsorted(self._keys, keys), self.sorted_count - 1)
+            hit = self._keys[pos] == keys
+            rows[hit] = pos[hit]
+        if self.count > self.sorted_count:
+            tail_keys, tail_rows = self._tail()
+            pos = np.minimum(np.searchsorted(tail_keys, keys), len(tail_keys) - 1)
+            hit = tail_keys[pos] == keys
+            rows[hit] = tail_rows[pos[hit]]
+        return rows
+
+    def get_many(self, keys):
+        """
+        Liest viele Zustände auf einmal: je eine gemeinsame Binärsuche im sortierten Bereich und im Anhang.
+        Gibt (gefunden als bool-Array, Q-Werte als float64-Array) zurück.
+        """
+        with self._lock:
+            rows = self._rows(keys)
+            found = rows >= 0
+            q_values = np.zeros((len(keys), 4))
+            if found.any():
+                q_values[found] = self._records["q"][rows[found]]
+        return found, q_values
+
+    def _write_header(self, f, sorted_count=None, count=None, stats=None):
+        stats = stats or self.stats
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, stats["version"], stats["games_played"], stats["best_score"],
+                            stats["best_tile"], self.sorted_count if sorted_count is None else sorted_count,
+                            self.count if count is None else count)
+                .ljust(HEADER_SIZE, b"\0"))
+
+    def write(self, entries, stats=None):
+        """
+        Schreibt geänderte Einträge: bekannte Zustände an Ort und Stelle, neue als Anhang.
+        entries: {Schlüssel: Q-Werte}
+        """
+        with self._lock:
+            self._write(entries, stats)
+            compact = self.count - self.sorted_count > max(4096, self.sorted_count // 4)
+        if compact:
+            self.compact()
+
+    def _write(self, entries, stats):
+        if self._compacting is not None:  # Nach dem Austausch der Datei noch einmal anwenden
+            self._compacting.update((key, np.array(q_values, dtype=np.float32)) for key, q_values in entries.items())
+        if stats:
+            self.stats.update(stats)
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "wb") as f:
+                self._write_header(f)
+
+        appended = []
+        rows = self._rows(list(entries)).tolist() if entries else []
+        for row, (key, q_values) in zip(rows, entries.items()):
+            if row < 0:
+                appended.append((key, q_values))
+            else:
+                self._records["q"][row] = q_values
+        if self._records is not None:
+            self._records.flush()
+
+        with open(self.path, "r+b") as f:
+            if appended:
+                block = np.empty(len(appended), dtype=RECORD_DTYPE)
+                block["key"] = [key for key, _ in appended]
+                block["q"] = [q for _, q in appended]
+                f.seek(HEADER_SIZE + self.count * RECORD_DTYPE.itemsize)
+                f.write(block.tobytes())
+                self.count += len(appended)
+            self._write_header(f)
+
+        if appended:
+            self._records = None  # memmap vor dem Neuabbilden freigeben
+            self._map()
+
+    def compact(self):
+        """
+        Sortiert den Anhang in den sortierten Bereich ein (schreibt die Datei einmal neu). Die neue
+        Datei entsteht ohne Sperre aus einer Kopie der Einträge; nur der Austausch hält die Sperre,
+        Änderungen aus der Zwischenzeit werden danach auf die neue Datei übertragen.
+        """
+        with self._lock:
+            if self._records is None or self._compacting is not None:
+                return
+            records = np.array(self._records)
+            stats = dict(self.stats)
+            self._compacting = {}
+
+        records = records[np.argsort(records["key"], kind="stable")]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            self._write_header(f, len(records), len(records), stats)
+            f.write(records.tobytes())
+
+        with self._lock:
+            changes, self._compacting = self._compacting, None
+            self._records = None
+            self._keys = None
+            os.replace(tmp_path, self.path)
+            self.sorted_count = self.count = len(records)
+            self._map()
+            self._write(changes, None)  # Schreibt auch den Header mit den aktuellen Statistiken
+
+
+ENTRY_BYTES = 256  # Grobe Schätzung des Speicherbedarfs eines Eintrags im Arbeitsspeicher
+
+
+class QTable:
+    """
+    Q-Tabelle mit gepackten Zustandsschlüsseln: Zugriffe landen zuerst im Arbeitsspeicher,
+    unbekannte Zustände werden bei Bedarf aus der Modelldatei nachgeladen.
+
+    Mit `max_entries` (oder `max_memory_mb`) ist der Arbeitsspeicher begrenzt. Verdrängt wird
+    nach `eviction`: "lru" (am längsten nicht benutzt) oder "visits" (am seltensten besucht, über
+    einen Heap mit verzögert aktualisierten Besuchszahlen). Geänderte Einträge werden beim Verdrängen in die Modelldatei
+    zurückgeschrieben, sofern ein Pfad bekannt ist – sonst gehen sie verloren.
+    """
+
+    def __init__(self, model_file=None, path=None, max_entries=None, max_memory_mb=None, eviction="lru", writer=None):
+        if eviction not in ("lru", "visits"):
+            raise ValueError(f"Unbekannte Verdrängungsstrategie: {eviction}")
+        self.file = model_file
+        self.path = path or (model_file.path if model_file is not None and not model_file.readonly else None)
+        if max_memory_mb is not None:
+            max_entries = int(max_memory_mb * 1024 * 1024 // ENTRY_BYTES)
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.entries = OrderedDict()
+        self.visits = {}
+        self._visit_heap = []  # (Besuche, Schlüssel) beim Einfügen; veraltete Zahlen werden erst beim Verdrängen erneuert
+        self.dirty = set()
+        self._evicted = {}  # Verdrängte, noch nicht geschriebene Änderungen
+        self._new = set()  # Zustände, die noch nicht in der Datei stehen
+        self._inflight = {}  # Im Hintergrund gespeicherte, noch nicht geschriebene Einträge
+        self._inflight_jobs = 0
+        self._inflight_lock = threading.Lock()
+        self._writer = writer  # Hintergrund-Writer (asyncai.CheckpointWriter) auch für verdrängte Einträge
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _insert(self, key, q_values):
+        self.entries[key] = q_values
+        self.visits[key] = 0
+        if self.eviction == "visits" and self.max_entries is not None:
+            heapq.heappush(self._visit_heap, (0, key))
+        if self.max_entries is not None and len(self.entries) > self.max_entries:
+            self._evict(protect=key)
+
+    def _evict(self, protect):
+        """Verdrängt einen Eintrag nach der gewählten Strategie (O(1) bzw. amortisiert O(log n))."""
+        key = next(iter(self.entries)) if self.eviction == "lru" else self._least_visited(protect)
+        q_values = self.entries.pop(key)
+        del self.visits[key]
+        self.evictions += 1
+        if key in self.dirty:
+            self.dirty.discard(key)
+            if self.path is not None:
+                self._evicted[key] = q_values
+                if len(self._evicted) >= 4096:
+                    self._flush_evicted()
+            else:
+                self._new.discard(key)  # Änderung geht verloren (z.B. Trainings-Worker ohne Schreibzugriff)
+
+    def _least_visited(self, protect):
+        """
+        Schlüssel mit den wenigsten Besuchen. Besuche zählen nur hoch, ein Heap-Eintrag ist also
+        höchstens zu niedrig: stimmt die Zahl des kleinsten noch, ist er wirklich der seltenste.
+        """
+        heap, visits = self._visit_heap, self.visits
+        skipped = None
+        while True:
+            count, key = heapq.heappop(heap)
+            current = visits.get(key)
+            if current is None:
+                continue  # Bereits verdrängt
+            if current != count:
+                heapq.heappush(heap, (current, key))
+            elif key == protect:
+                skipped = (count, key)  # Gerade eingefügt, bleibt im Speicher
+            else:
+                break
+        if skipped is not None:
+            heapq.heappush(heap, skipped)
+        return key
+
+    def _flush_evicted(self):
+        if self.file is None:
+            self.file = ModelFile(self.path)
+        if self._writer is not None:
+            self._submit(self._evicted, None)  # Nicht im aufrufenden (Render-)Thread schreiben
+        else:
+            self.file.write(self._evicted)
+            self._new.difference_update(self._evicted)
+        self._evicted = {}
+
+    def _load(self, key):
+        q_values = self._evicted.pop(key, None)
+        if q_values is not None:
+            self._insert(key, q_values)
+            self.dirty.add(key)
+            return q_values
+        q_values = self._inflight.get(key)
+        if q_values is not None:  # Noch auf dem Weg in die Datei: dort stünde der alte Wert
+            q_values = q_values.copy()
+            self._insert(key, q_values)
+            return q_values
+        if self.file is None:
+            return None
+        q_values = self.file.get(key)
+        if q_values is not None:
+            self._insert(key, q_values)
+        return q_values
+
+    def get(self, key, default=None):
+        q_values = self.entries.get(key)
+        if q_values is None:
+            q_values = self._load(key)
+            if q_values is None:
+                self.misses += 1
+                return default
+        else:
+            self.hits += 1
+            if self.eviction == "lru":
+                self.entries.move_to_end(key)
+        self.visits[key] += 1
+        return q_values
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        q_values = self.get(key)
+        if q_values is None:
+            raise KeyError(key)
+        return q_values
+
+    def __setitem__(self, key, q_values):
+        if key in self.entries:
+            self.entries[key] = q_values
+            if self.eviction == "lru":
+                self.entries.move_to_end(key)
+        elif self._load(key) is not None:
+            self.entries[key] = q_values
+        else:
+            self._new.add(key)
+            self._insert(key, q_values)
+        self.visits[key] += 1
+        self.dirty.add(key)
+
+    def gather(self, keys, out):
+        """
+        Wie `get(key, 0)` für viele Schlüssel auf einmal, Ergebnis zeilenweise in `out`.
+        Der Arbeitsspeicher bleibt ein Dict-Zugriff pro Schlüssel; alles, was dort fehlt,
+        wird gesammelt und mit einer gemeinsamen Binärsuche aus der Modelldatei nachgeladen.
+        """
+        keys = keys.tolist()
+        entries, visits, lru = self.entries, self.visits, self.eviction == "lru"
+        missing = []
+        for n, key in enumerate(keys):
+            q_values = entries.get(key)
+            if q_values is None:
+                missing.append(n)
+                continue
+            out[n] = q_values
+            if lru:
+                entries.move_to_end(key)
+            visits[key] += 1
+        self.hits += len(keys) - len(missing)
+        from_file = []
+        for n in missing:
+            key = keys[n]
+            if self.file is None or key in self._evicted or key in self._inflight:
+                out[n] = self.get(key, 0.0)  # Selten: Sonderfälle wie bei get()
+            else:
+                from_file.append(n)
+        if not from_file:
+            return out
+        found, q_file = self.file.get_many([keys[n] for n in from_file])
+        for n, hit, q_values in zip(from_file, found.tolist(), q_file):
+            key = keys[n]
+            if not hit:
+                out[n] = 0.0
+                self.misses += 1
+                continue
+            current = entries.get(key)  # Doppelt im Batch: schon beim ersten Mal geladen
+            if current is None:
+                current = q_values.copy()  # Eigenes Array, keine Sicht auf den Batch
+                self._insert(key, current)
+            out[n] = current
+            visits[key] += 1
+        return out
+
+    def scatter(self, keys, values):
+        """
+        Wie `table[key] = values[n]` für viele Schlüssel: vorhandene Arrays werden überschrieben,
+        für neue Schlüssel klärt eine gemeinsame Binärsuche, ob sie schon in der Modelldatei stehen.
+        """
+        keys = keys.tolist()
+        entries, visits, dirty, lru = self.entries, self.visits, self.dirty, self.eviction == "lru"
+        missing = []
+        for n, key in enumerate(keys):
+            entry = entries.get(key)
+            if entry is None:
+                missing.append(n)
+                continue
+            entry[:] = values[n]
+            if lru:
+                entries.move_to_end(key)
+            visits[key] += 1
+            dirty.add(key)
+        if not missing:
+            return
+        if self.file is not None:
+            in_file, _ = self.file.get_many([keys[n] for n in missing])
+            in_file = in_file.tolist()
+        else:
+            in_file = [False] * len(missing)
+        for n, known in zip(missing, in_file):
+            key = keys[n]
+            entry = entries.get(key)
+            if entry is not None:  # Doppelt im Batch
+                entry[:] = values[n]
+            elif key in self._evicted or key in self._inflight:
+                self[key] = np.array(values[n], dtype=np.float64)
+                continue
+            else:
+                if not known:
+                    self._new.add(key)
+                self._insert(key, np.array(values[n], dtype=np.float64))
+            visits[key] += 1
+            dirty.add(key)
+
+    def __len__(self):
+        return (len(self.file) if self.file is not None else 0) + len(self._new)
+
+    def stats(self):
+        """Kennzahlen für das Debug-Overlay."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "in_memory": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def pending(self):
+        """Alle seit dem letzten Speichern geänderten Einträge."""
+        pending = dict(self._evicted)
+        pending.update((key, self.entries[key]) for key in self.dirty)
+        return pending
+
+    def save(self, path, stats, writer=None):
+        """
+        Schreibt nur die geänderten Einträge in die Modelldatei.
+        Mit `writer` (z.B. asyncai.CheckpointWriter) wird eine Kopie der Einträge im Hintergrund
+        geschrieben; bis dahin beantwortet die Tabelle Anfragen nach diesen Zuständen selbst.
+        """
+        self.path = path
+        if self.file is None:
+            self.file = ModelFile(path)
+        if writer is None:
+            self.file.write(self.pending(), stats)
+            self._new = set()
+        else:
+            self._writer = writer
+            self._submit({key: np.array(q_values, dtype=np.float64) for key, q_values in self.pending().items()}, dict(stats))
+        self.dirty.clear()
+        self._evicted = {}
+
+    def _submit(self, snapshot, stats):
+        """Übergibt Einträge dem Hintergrund-Writer (Reihenfolge der Schreibvorgänge bleibt erhalten)."""
+        with self._inflight_lock:
+            self._inflight = {**self._inflight, **snapshot}
+            self._inflight_jobs += 1
+        self._writer.submit(self._write_snapshot, snapshot, stats)
+
+    def _write_snapshot(self, snapshot, stats):
+        """Läuft im Hintergrund-Thread: schreibt eine Kopie und gibt sie danach frei."""
+        try:
+            self.file.write(snapshot, stats)
+        finally:
+            with self._inflight_lock:
+                self._new.difference_update(snapshot)
+                self._inflight_jobs -= 1
+                if not self._inflight_jobs:
+                    self._inflight = {}
@@ -0,0 +1,103 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from module import bitboard
+from module.engine import auto_move_policy, greedy_move
+
+# Reiner Monte-Carlo-Spieler: für jede Richtung werden Partien bis zum Spielende
+# ausgespielt, gewählt wird der Zug mit der besten durchschnittlichen Punktzahl.
+# Die Rollouts laufen verteilt in einem Prozesspool und sind durch ein Zeitbudget begrenzt.
+
+
+def rollout(board, rng, policy="random"):
+    """Spielt ein Brett bis zum Ende aus und gibt die dabei erzielten Punkte zurück."""
+    score = 0
+    while True:
+        if policy == "auto":
+            direction = auto_move_policy(board)
+            if direction is None:
+                return score
+            new_board, points = bitboard.move(board, direction)
+        else:
+            candidates = [m for m in bitboard.all_moves(board) if m[0] != board]
+            if not candidates:
+                return score
+            new_board, points = rng.choice(candidates)
+        score += points
+        board = bitboard.spawn(new_board, rng)
+
+
+def _rollout_worker(board, directions, deadline, seed, policy):
+    """
+    Führt abwechselnd für alle Richtungen Rollouts aus, bis `deadline` (time.time) erreicht ist.
+    Gibt {Richtung: (Punktsumme, Anzahl)} zurück.
+    """
+    rng = random.Random(seed)
+    first_moves = [(d, *bitboard.move(board, d)) for d in directions]
+    totals = {d: [0, 0] for d in directions}
+    while True:
+        for direction, first_board, points in first_moves:
+            result = points + rollout(bitboard.spawn(first_board, rng), rng, policy)
+            totals[direction][0] += result
+            totals[direction][1] += 1
+        if time.time() >= deadline:
+            return {d: tuple(v) for d, v in totals.items()}
+
+
+class MonteCarloAI:
+    """Monte-Carlo-Spieler: mehr Kerne bedeuten mehr Rollouts pro Zug und damit stärkeres Spiel."""
+
+    def __init__(self, time_budget=0.2, workers=None, policy="random"):
+        self.time_budget = time_budget            # Sekunden pro Entscheidung
+        self.workers = workers or os.cpu_count() or 1
+        self.policy = policy                      # "random" oder "auto" (Strategie von auto_move)
+        self.last_rollouts = 0
+        self.rollouts_per_sec = 0.0
+        self._pool = None
+        self._seed = random.Random()
+
+    def _get_pool(self):
+        """Startet den Prozesspool beim ersten Zug."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def choose_action(self, game):
+        """
+        Wählt den Zug mit der besten durchschnittlichen Rollout-Punktzahl.
+        Ab einer 32768er-Kachel rechnen die Rollouts nicht mehr exakt – dann gierig auf dem Raster.
+        """
+        grid = game.grid
+        if not bitboard.fits(grid):
+            return greedy_move(grid)
+        return self.best_move(bitboard.from_grid(grid))
+
+    def best_move(self, board):
+        """Gibt die beste Richtung oder None zurück, wenn kein Zug möglich ist."""
+        legal = bitboard.legal_moves(board)
+        if len(legal) <= 1:
+            return legal[0] if legal else None
+
+        start = time.time()
+        deadline = start + self.time_budget
+        pool = self._get_pool()
+        futures = [pool.submit(_rollout_worker, board, legal, deadline, self._seed.getrandbits(64), self.policy)
+                   for _ in range(self.workers)]
+
+        totals = {d: [0, 0] for d in legal}
+        for future in futures:
+            for direction, (score, count) in future.result().items():
+                totals[direction][0] += score
+                totals[direction][1] += count
+
+        self.last_rollouts = sum(count for _, count in totals.values())
+        self.rollouts_per_sec = self.last_rollouts / max(time.time() - start, 1e-9)
+        return max(legal, key=lambda d: totals[d][0] / max(totals[d][1], 1))
+
+    def close(self):
+        """Beendet den Prozesspool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,193 @@
+import os
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from module import bitboard, engine
+from module.ai import save_model_info, load_model_info
+from module.replay import ReplayBuffer
+
+# N-Tupel-Netz als Wertfunktion auf Afterstates (Brett nach dem Zug, vor dem Spawn).
+# Feste Muster aus je vier Zellen: 4 Zeilen, 4 Spalten und 9 2x2-Quadrate.
+# Jedes Muster hat eine eigene float32-Tabelle mit 16^4 Einträgen, indiziert über die
+# gepackten Exponenten – der Speicherbedarf ist damit fest (17 * 65536 * 4 Byte ≈ 4,5 MB).
+
+NUM_PATTERNS = 17
+PATTERN_SIZE = 65536
+_OFFSETS = np.arange(NUM_PATTERNS, dtype=np.int64) * PATTERN_SIZE
+_SQUARE_SHIFTS = [16 * i + 4 * j for i in range(3) for j in range(3)]
+
+
+def pattern_keys(board):
+    """Liefert die 17 Musterschlüssel eines Bretts (Zeilen, Spalten, 2x2-Quadrate)."""
+    t = bitboard.transpose(board)
+    keys = [
+        board & 0xFFFF, (board >> 16) & 0xFFFF, (board >> 32) & 0xFFFF, board >> 48,
+        t & 0xFFFF, (t >> 16) & 0xFFFF, (t >> 32) & 0xFFFF, t >> 48,
+    ]
+    for shift in _SQUARE_SHIFTS:
+        keys.append(((board >> shift) & 0xFF) | (((board >> (shift + 16)) & 0xFF) << 8))
+    return keys
+
+
+def pattern_indices(boards):
+    """Vektorisierte Variante von pattern_keys: Tabellenindizes für ein uint64-Array von Brettern, Form (n, 17)."""
+    boards = np.asarray(boards, dtype=np.uint64)
+    t = bitboard.transpose(boards)
+    keys = np.empty((len(boards), NUM_PATTERNS), dtype=np.int64)
+    for k in range(4):
+        keys[:, k] = (boards >> np.uint64(16 * k)) & np.uint64(0xFFFF)
+        keys[:, 4 + k] = (t >> np.uint64(16 * k)) & np.uint64(0xFFFF)
+    for n, shift in enumerate(_SQUARE_SHIFTS):
+        keys[:, 8 + n] = ((boards >> np.uint64(shift)) & np.uint64(0xFF)) | (((boards >> np.uint64(shift + 16)) & np.uint64(0xFF)) << np.uint64(8))
+    keys += _OFFSETS
+    return keys
+
+
+class NTupleAI:
+    """TD(0)-Lerner auf Afterstates mit derselben Schnittstelle wie AI2048."""
+
+    def __init__(self, learning_rate=0.0025, exploration_rate=0.0, exploration_decay=0.995, load=True,
+                 replay_capacity=None, batch_size=32, replay_every=4):
+        self.weights = np.zeros(NUM_PATTERNS * PATTERN_SIZE, dtype=np.float32)
+        # Experience Replay auf Afterstate-Übergängen (None = TD-Update direkt pro Zug)
+        self.replay = ReplayBuffer(replay_capacity, batch_size) if replay_capacity else None
+        self.replay_every = replay_every  # Ein Minibatch pro `replay_every` Übergänge
+        self._replay_steps = 0
+        self.learning_rate = learning_rate
+        self.exploration_rate = exploration_rate
+        self.exploration_decay = exploration_decay
+        self.games_played = 0
+        self.best_score = 0
+        self.best_tile = 0
+        self.version = 1  # Modellversion
+        self.model_path = "app_data/ntuple_model.npy"
+        self.info_path = "app_data/ntuple_info.txt"
+        self._last_afterstate = None  # Afterstate des letzten Zuges für das TD-Update
+        if load:
+            self.load_model()
+
+    def get_state(self, grid):
+        """Bitboard des Rasters oder None ab einer 32768er-Kachel (dann rechnet das Bitboard nicht mehr exakt)."""
+        return bitboard.from_grid(grid) if bitboard.fits(grid) else None
+
+    def indices(self, boards):
+        """Indizes aller Muster für mehrere Bretter als (len(boards), 17)-Array."""
+        return np.array([pattern_keys(b) for b in boards], dtype=np.int64) + _OFFSETS
+
+    def values(self, boards):
+        """Bewertet mehrere Afterstates gleichzeitig."""
+        return self.weights[self.indices(boards)].sum(axis=1)
+
+    def value(self, board):
+        return float(self.weights[np.array(pattern_keys(board), dtype=np.int64) + _OFFSETS].sum())
+
+    def best_afterstate(self, board):
+        """
+        Wählt den Zug mit maximaler Summe aus Punkten und Wert des Afterstates.
+        Gibt (Richtung, Afterstate, Punkte) oder None zurück, wenn kein Zug möglich ist.
+        """
+        moves = [(d, new_board, points) for d, (new_board, points) in enumerate(bitboard.all_moves(board))
+                 if new_board != board]
+        if not moves:
+            return None
+        scores = self.values([m[1] for m in moves]) + np.array([m[2] for m in moves], dtype=np.float32)
+        return moves[int(np.argmax(scores))]
+
+    def choose_action(self, game):
+        board = self.get_state(game.grid)
+        if board is None:  # Außerhalb des Bitboards: gierig nach Punkten auf dem Raster
+            direction = engine.greedy_move(game.grid)
+            return random.choice([0, 1, 2, 3]) if direction is None else direction
+        if random.random() < self.exploration_rate:
+            return random.choice([0, 1, 2, 3])  # Zufallsbewegung
+        best = self.best_afterstate(board)
+        return best[0] if best else random.choice([0, 1, 2, 3])
+
+    def _td_update(self, afterstate, target):
+        idx = np.array(pattern_keys(afterstate), dtype=np.int64) + _OFFSETS
+        error = target - self.weights[idx].sum()
+        self.weights[idx] += self.learning_rate * error
+
+    def update_q_table(self, old_state, action, reward, new_state, done=False, afterstate=None):
+        """
+        TD(0)-Update auf Afterstates: der Afterstate des vorigen Zuges lernt Punkte und
+        Wert des jetzigen Afterstates. Belohnung sind die Punkte des Zuges selbst,
+        `new_state` und `done` werden daher nicht benötigt. Außerhalb des Bitboards wird nicht gelernt.
+        afterstate: Raster, das der Zug im Spiel tatsächlich erzeugt hat (Punkte dann aus `reward`);
+        ohne wird der Zug auf `old_state` nachgerechnet.
+        """
+        if old_state is None:
+            return
+        if afterstate is None:
+            afterstate, points = bitboard.move(old_state, action)
+        elif bitboard.fits(afterstate):
+            afterstate, points = bitboard.from_grid(afterstate), reward
+        else:
+            return
+        if afterstate == old_state:
+            return
+        if self._last_afterstate is not None:
+            if self.replay is not None:
+                self._replay_add(self._last_afterstate, points, afterstate, False)
+            else:
+                self._td_update(self._last_afterstate, points + self.value(afterstate))
+        self._last_afterstate = afterstate
+
+    def end_episode(self):
+        """Das Spielende hat den Wert 0: letzter Afterstate lernt auf dieses Ziel."""
+        if self._last_afterstate is not None:
+            if self.replay is not None:
+                self._replay_add(self._last_afterstate, 0.0, 0, True)
+            else:
+                self._td_update(self._last_afterstate, 0.0)
+            self._last_afterstate = None
+
+    def _replay_add(self, afterstate, points, next_afterstate, done):
+        self.replay.add(afterstate, 0, points, next_afterstate, done)
+        self._replay_steps += 1
+        if self._replay_steps % self.replay_every == 0 and len(self.replay) >= self.replay.batch_size:
+            self.replay_update()
+
+    def replay_update(self):
+        """TD(0) auf einem Minibatch von Afterstate-Übergängen, komplett vektorisiert."""
+        states, _, rewards, next_states, dones = self.replay.sample()
+        idx = pattern_indices(states)
+        next_values = self.weights[pattern_indices(next_states)].sum(axis=1)
+        next_values[dones] = 0.0
+        delta = self.learning_rate * (rewards + next_values - self.weights[idx].sum(axis=1))
+        # add.at summiert auch mehrfach getroffene Tabelleneinträge korrekt auf
+        np.add.at(self.weights, idx, np.broadcast_to(delta[:, None], idx.shape))
+
+    def decay_exploration(self):
+        self.exploration_rate *= self.exploration_decay
+
+    def save_model(self, writer=None):
+        """
+        Speichert die Gewichte und Modellinfos nach einem abgeschlossenen Spiel.
+        Mit `writer` (asyncai.CheckpointWriter) wird eine Kopie der Gewichte im Hintergrund geschrieben.
+        """
+        self.version += 1  # Versionsnummer erhöhen
+        os.makedirs("app_data", exist_ok=True)
+        info = SimpleNamespace(version=self.version, best_score=self.best_score,
+                               best_tile=self.best_tile, games_played=self.games_played)
+        if writer is None:
+            self._write_checkpoint(self.weights, info)
+        else:
+            writer.submit(self._write_checkpoint, self.weights.copy(), info)
+
+    def _write_checkpoint(self, weights, info):
+        np.save(self.model_path, weights)
+        save_model_info(info, self.info_path)
+        print(f"💾 Modell gespeichert als {self.model_path} (Version {info.version})")
+
+    def load_model(self):
+        """Lädt die bestehenden Gewichte, falls vorhanden."""
+        if os.path.exists(self.model_path):
+            weights = np.load(self.model_path)
+            if weights.shape == self.weights.shape:
+                self.weights = weights.astype(np.float32, copy=False)
+                print(f"📥 Modell geladen: {self.model_path}")
+        load_model_info(self, self.info_path)
+        print(f"🔄 Aktuelle Modell-Version: {self.version}")
@@ -0,0 +1,90 @@
+import atexit
+import os
+import threading
+
+# Write-Behind für kleine Textdateien (Highscore, Modellinfos): Werte werden nur im Speicher
+# aktualisiert, ein Hintergrund-Thread schreibt sie frühestens `delay` Sekunden nach der ersten
+# Änderung. Mehrere Änderungen derselben Datei werden dabei zu einem Schreibvorgang zusammengefasst.
+# Geschrieben wird atomar (temporäre Datei + os.replace), eine abgebrochene Sitzung hinterlässt
+# also nie eine halbe Datei. Am Spielende und beim Beenden wird sofort geschrieben (flush).
+
+WRITE_DELAY = 5.0  # Sekunden, die Änderungen gesammelt werden
+
+
+def write_atomic(path, text):
+    """Schreibt den Text zuerst in eine temporäre Datei und ersetzt dann das Ziel in einem Schritt."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class WriteBehind:
+    """Sammelt den jeweils neuesten Inhalt pro Datei und schreibt ihn verzögert im Hintergrund."""
+
+    def __init__(self, delay=WRITE_DELAY):
+        self.delay = delay
+        self._pending = {}  # Pfad -> neuester, noch nicht geschriebener Inhalt
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()  # Hält Abholen und Schreiben zusammen, damit nie ein älterer Stand gewinnt
+        self._closed = False
+        self._thread = None
+
+    def put(self, path, text):
+        """Merkt sich den neuen Inhalt; geschrieben wird später (oder bei flush)."""
+        path = os.path.abspath(path)  # Spätere Wechsel des Arbeitsverzeichnisses ändern das Ziel nicht
+        with self._cond:
+            self._pending[path] = text
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def read(self, path):
+        """Liest den aktuellen Inhalt – noch nicht geschriebene Änderungen zuerst – oder None."""
+        path = os.path.abspath(path)
+        with self._cond:
+            if path in self._pending:
+                return self._pending[path]
+        try:
+            with open(path, "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                # Weitere Änderungen sammeln, bis die Wartezeit um ist
+                self._cond.wait_for(lambda: self._closed, timeout=self.delay)
+                closed = self._closed
+            self.flush()
+            if closed:
+                break
+
+    def flush(self):
+        """Schreibt alle ausstehenden Änderungen sofort."""
+        with self._io_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            for path, text in pending.items():
+                try:
+                    write_atomic(path, text)
+                except OSError as e:
+                    print(f"⚠️ {path} konnte nicht gespeichert werden: {e}")
+
+    def close(self):
+        """Schreibt Ausstehendes und beendet den Hintergrund-Thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+
+store = WriteBehind()  # Gemeinsamer Speicher für Spiel und Modelle
+atexit.register(store.close)  # Auch Skripte ohne Fenster verlieren keine Änderungen
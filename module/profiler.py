@@ -0,0 +1,146 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# Instrumentierung der Hauptschleife: Phasen (Events, KI, Update, Zeichnen, Display) werden
+# pro Aufruf gemessen und in Ringpuffern fester Größe gehalten; daraus kommen die rollierenden
+# Perzentile für das Debug-Overlay. Ausgeschaltet liefert phase() einen geteilten Null-Kontext,
+# die Hooks kosten dann nur einen Methodenaufruf.
+
+_NULL = nullcontext()
+
+
+class RingBuffer:
+    """Float-Ringpuffer fester Größe für Messwerte."""
+
+    def __init__(self, size):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def percentiles(self, qs=(50, 95, 99)):
+        if not self.count:
+            return [0.0] * len(qs)
+        return np.percentile(self.values[:self.count], qs).tolist()
+
+
+class _PhaseTimer:
+    """Kontextmanager einer Phase; wird pro Name einmal angelegt und wiederverwendet."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler:
+    """
+    Sammelt Laufzeiten pro Phase, Zähler und einen Frame-Trace.
+    Nutzung: `with profiler.phase("draw"): ...` und einmal pro Frame `profiler.end_frame()`.
+    """
+
+    def __init__(self, size=600, enabled=False):
+        self.size = size  # Einträge pro Ringpuffer bzw. Frames im Trace
+        self.enabled = enabled
+        self.buffers = {}
+        self.counters = {}
+        self.trace = deque(maxlen=size)
+        self.frame = 0
+        self._timers = {}
+        self._current = {}  # Phasensummen des laufenden Frames
+        self._lines = (0.0, [])  # (Zeitpunkt, Zeilen) des zuletzt erzeugten Berichts
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def phase(self, name):
+        """Kontextmanager, der die Laufzeit des Blocks unter `name` verbucht."""
+        if not self.enabled:
+            return _NULL
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer(self, name)
+        return timer
+
+    def record(self, name, seconds):
+        """Verbucht eine Messung (z.B. die Dauer eines Modell-Speicherns)."""
+        if not self.enabled:
+            return
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer(self.size)
+        buffer.append(seconds)
+        self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        """Setzt einen Momentanwert (z.B. Größe der Q-Tabelle)."""
+        if self.enabled:
+            self.counters[name] = value
+
+    def end_frame(self):
+        """Schließt den Frame ab und legt seine Phasensummen im Trace ab."""
+        if not self.enabled:
+            return
+        self.frame += 1
+        self.trace.append((self.frame, time.time(), self._current))
+        self._current = {}
+
+    def summary(self):
+        """{Phase: {p50, p95, p99 in ms, Anzahl}} über den Inhalt der Ringpuffer."""
+        result = {}
+        for name, buffer in self.buffers.items():
+            p50, p95, p99 = buffer.percentiles()
+            result[name] = {"p50_ms": p50 * 1e3, "p95_ms": p95 * 1e3, "p99_ms": p99 * 1e3, "samples": buffer.count}
+        return result
+
+    def report_lines(self, max_age=0.5):
+        """Zeilen für das Debug-Overlay; höchstens alle `max_age` Sekunden neu berechnet."""
+        now = time.perf_counter()
+        if now - self._lines[0] < max_age:
+            return self._lines[1]
+        lines = ["Phase      p50 / p95 / p99 ms"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<10} {s['p50_ms']:.2f} / {s['p95_ms']:.2f} / {s['p99_ms']:.2f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        self._lines = (now, lines)
+        return lines
+
+    def export(self, path):
+        """Schreibt den Trace als CSV (eine Zeile pro Frame) und die Zusammenfassung als JSON."""
+        phases = sorted({name for _, _, row in self.trace for name in row})
+        with open(path + ".csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "time"] + [f"{name}_ms" for name in phases])
+            for frame, timestamp, row in self.trace:
+                writer.writerow([frame, f"{timestamp:.3f}"] + [f"{row.get(name, 0.0) * 1e3:.4f}" for name in phases])
+        with open(path + ".json", "w") as f:
+            json.dump({
+                "summary": self.summary(),
+                "counters": self.counters,
+                "frames": [{"frame": frame, "time": timestamp, **{name: v * 1e3 for name, v in row.items()}}
+                           for frame, timestamp, row in self.trace],
+            }, f, indent=2)
+        return path + ".csv", path + ".json"
@@ -0,0 +1,232 @@
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+
+from module import bitboard
+
+# Kompakte Binär-Aufzeichnung von Spielen:
+#   Datei-Header: Magic + Formatversion
+#   pro Spiel:    Seed (uint64), Anzahl Züge (uint32), zwei Start-Spawns, dann ein Byte pro Zug
+# Jedes Spawn-/Zug-Byte: Bits 0-1 Richtung (0=Up, 1=Right, 2=Down, 3=Left), Bit 2 Wert (0 = 2, 1 = 4),
+# Bits 3-6 Position der neuen Kachel (Zeile * 4 + Spalte). Aufgezeichnet werden nur gültige Züge –
+# auf jeden folgt genau ein Spawn, das Spiel lässt sich also ohne Entscheidungen der KI nachspielen.
+
+MAGIC = b"G2048REC"
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct("<8sB")
+GAME_HEADER = struct.Struct("<QI")
+
+
+def pack_step(direction, pos, value):
+    """Packt Richtung, Spawn-Position und -Wert in ein Byte."""
+    return (direction & 3) | ((value == 4) << 2) | (pos << 3)
+
+
+def unpack_step(byte):
+    """Gibt (Richtung, Position, Wert) eines Zug-Bytes zurück."""
+    return byte & 3, (byte >> 3) & 0xF, 4 if byte & 4 else 2
+
+
+class GameRecorder:
+    """Sammelt die Bytes des laufenden Spiels; Game2048 meldet Züge und Spawns."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.seed = 0
+        self.steps = bytearray()
+        self._direction = None  # Richtung des letzten Zuges, bis dessen Spawn kommt
+
+    def start(self, seed):
+        self.seed = seed
+        self.steps = bytearray()
+        self._direction = None
+
+    def move(self, direction):
+        self._direction = direction
+
+    def spawn(self, i, j, value):
+        direction = self._direction if self._direction is not None else 0
+        self.steps.append(pack_step(direction, i * 4 + j, value))
+        self._direction = None
+
+    def end_game(self):
+        """Übergibt das Spiel an den Writer (auch unvollständige Spiele bleiben gültig)."""
+        if len(self.steps) >= 2:
+            self.writer.write(GAME_HEADER.pack(self.seed, len(self.steps) - 2) + bytes(self.steps))
+        self.steps = bytearray()
+
+
+class RecordingWriter:
+    """
+    Schreibt aufgezeichnete Spiele in einem Hintergrund-Thread an die Datei an,
+    damit die Hauptschleife nie auf die Festplatte wartet.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "ab", buffering=1 << 16) as f:
+            if new_file:
+                f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+            while True:
+                block = self._queue.get()
+                if block is None:
+                    break
+                f.write(block)
+                if self._queue.empty():
+                    f.flush()  # Nur schreiben, wenn gerade nichts nachkommt
+
+    def write(self, block):
+        self._queue.put(block)
+
+    def close(self):
+        """Schreibt alle ausstehenden Spiele und beendet den Thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class RecordedGame:
+    """Ein aufgezeichnetes Spiel: Seed, Start-Spawns und Züge (Bytes)."""
+
+    def __init__(self, seed, steps):
+        self.seed = seed
+        self.initial = [unpack_step(b)[1:] for b in steps[:2]]  # [(Position, Wert), ...]
+        self.moves = steps[2:]
+
+    def __len__(self):
+        return len(self.moves)
+
+
+def read_games(path):
+    """Liest alle Spiele einer Aufzeichnung (Generator)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} ist keine Aufzeichnung im Format {FORMAT_VERSION}")
+    offset = FILE_HEADER.size
+    while offset + GAME_HEADER.size <= len(data):
+        seed, count = GAME_HEADER.unpack_from(data, offset)
+        offset += GAME_HEADER.size
+        yield RecordedGame(seed, data[offset:offset + count + 2])
+        offset += count + 2
+
+
+def _exponent(value):
+    return 1 if value == 2 else 2
+
+
+def replay(game):
+    """
+    Spielt ein Spiel headless auf dem Bitboard nach.
+    Liefert nach jedem Zug (Brett, Richtung, Punkte) – das Brett inklusive des neuen Spawns.
+    """
+    board = 0
+    for pos, value in game.initial:
+        board |= _exponent(value) << (4 * pos)
+    yield board, None, 0
+    for byte in game.moves:
+        direction, pos, value = unpack_step(byte)
+        board, points = bitboard.move(board, direction)
+        board |= _exponent(value) << (4 * pos)
+        yield board, direction, points
+
+
+def final_state(game):
+    """Endstand eines Spiels: (Brett, Punktzahl, höchste Kachel) ohne Zwischenstände."""
+    board = 0
+    score = 0
+    for pos, value in game.initial:
+        board |= _exponent(value) << (4 * pos)
+    move = bitboard.move
+    for byte in game.moves:
+        board, points = move(board, byte & 3)
+        score += points
+        board |= (2 if byte & 4 else 1) << (4 * ((byte >> 3) & 0xF))
+    return board, score, 1 << bitboard.max_exponent(board)
+
+
+def apply_step(view, byte, instant=False):
+    """
+    Führt ein Zug-Byte auf einem Game2048 aus: der aufgezeichnete Spawn wird vorgegeben.
+    Nach 2048 wird weitergespielt wie im aufgezeichneten Spiel. Gibt zurück, ob gezogen wurde.
+    """
+    view.settle()
+    if view.game_won and not view.continue_after_win:
+        view.continue_game()  # Sonst ignoriert move() alle weiteren Züge
+    direction, pos, value = unpack_step(byte)
+    view.forced_spawns.append((pos, value))
+    return view.move(direction, instant)
+
+
+def play_back(game, speed=1.0):
+    """Zeigt ein aufgezeichnetes Spiel im Fenster: Game2048 bekommt Züge und Spawns vorgegeben."""
+    import pygame
+    from module.Gamemodule import Game2048
+
+    view = Game2048()
+    screen = pygame.display.set_mode(view.config.WINDOW_SIZE)
+    pygame.display.set_caption(f"2048 – Wiedergabe (Seed {game.seed})")
+    view.reset_game(forced_spawns=list(game.initial))
+    clock = pygame.time.Clock()
+    moves = iter(game.moves)
+    running = True
+    while running:
+        dt = clock.tick(60) / 1000
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        if not view.is_animating():
+            byte = next(moves, None)
+            if byte is not None:
+                apply_step(view, byte)
+        view.update(dt * speed)
+        dirty = view.draw(screen)
+        if dirty:
+            pygame.display.update(dirty)
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aufgezeichnete 2048-Spiele auswerten und abspielen")
+    parser.add_argument("path", nargs="?", default=os.path.join("app_data", "games.rec"), help="Aufzeichnungsdatei")
+    parser.add_argument("--show", type=int, default=None, help="Spiel Nr. N im Fenster abspielen")
+    parser.add_argument("--speed", type=float, default=1.0, help="Abspielgeschwindigkeit der Animationen")
+    args = parser.parse_args()
+
+    if args.show is not None:
+        for n, game in enumerate(read_games(args.path)):
+            if n == args.show:
+                play_back(game, args.speed)
+                return
+        raise SystemExit(f"Spiel {args.show} nicht gefunden")
+
+    start = time.perf_counter()
+    games = moves = best_score = best_tile = total_score = 0
+    for game in read_games(args.path):
+        _, score, tile = final_state(game)
+        games += 1
+        moves += len(game)
+        total_score += score
+        best_score = max(best_score, score)
+        best_tile = max(best_tile, tile)
+    elapsed = time.perf_counter() - start
+    if not games:
+        print(f"Keine Spiele in {args.path}")
+        return
+    print(f"📼 {games} Spiele, {moves} Züge ({os.path.getsize(args.path) / games:.0f} Byte/Spiel)")
+    print(f"   Ø Punktzahl {total_score / games:.0f}, beste Punktzahl {best_score}, beste Kachel {best_tile}")
+    print(f"   Nachgespielt in {elapsed:.2f}s ({moves / elapsed:.0f} Züge/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Experience Replay mit fester Speichergröße: alle Übergänge liegen in vorab angelegten
+# NumPy-Arrays (Ringpuffer), Minibatches werden per np.take in ebenfalls vorab angelegte
+# Batch-Arrays kopiert. Pro Schritt entstehen dadurch keine neuen Python- oder NumPy-Objekte.
+
+
+class ReplayBuffer:
+    """Ringpuffer für Übergänge (Zustand, Aktion, Belohnung, Folgezustand, Spielende)."""
+
+    def __init__(self, capacity=100000, batch_size=32, seed=None):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.states = np.zeros(capacity, dtype=np.uint64)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.uint64)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.pos = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+        # Wiederverwendete Arrays für Minibatches
+        self._uniform = np.empty(batch_size, dtype=np.float64)
+        self._idx = np.empty(batch_size, dtype=np.int64)
+        self.batch = (
+            np.empty(batch_size, dtype=np.uint64),
+            np.empty(batch_size, dtype=np.uint8),
+            np.empty(batch_size, dtype=np.float32),
+            np.empty(batch_size, dtype=np.uint64),
+            np.empty(batch_size, dtype=bool),
+        )
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done=False):
+        """Schreibt einen Übergang an die aktuelle Position (ältester Eintrag wird überschrieben)."""
+        pos = self.pos
+        self.states[pos] = state
+        self.actions[pos] = action
+        self.rewards[pos] = reward
+        self.next_states[pos] = next_state
+        self.dones[pos] = done
+        self.pos = (pos + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def mark_done(self):
+        """Markiert den zuletzt geschriebenen Übergang als Spielende."""
+        if self.size:
+            self.dones[self.pos - 1] = True
+
+    def sample(self):
+        """
+        Zieht einen Minibatch (mit Zurücklegen) in die wiederverwendeten Batch-Arrays.
+        Gibt (Zustände, Aktionen, Belohnungen, Folgezustände, Spielenden) zurück – bis zum
+        nächsten Aufruf gültig.
+        """
+        self.rng.random(out=self._uniform)
+        np.multiply(self._uniform, self.size, out=self._uniform)
+        self._idx[...] = self._uniform  # Abrunden beim Kopieren nach int64
+        for source, target in zip((self.states, self.actions, self.rewards, self.next_states, self.dones), self.batch):
+            np.take(source, self._idx, out=target)
+        return self.batch
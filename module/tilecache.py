@@ -0,0 +1,132 @@
+import pygame
+
+# Cache für vorgerenderte Kacheln, Texte und Overlays: draw() besteht damit fast nur noch aus Blits.
+
+
+class TileCache:
+    """Hält je (Wert, Größen-Bucket) eine fertige Kachel-Surface mit abgerundetem Rechteck und zentriertem Text."""
+
+    SIZE_STEP = 2      # Breite eines Größen-Buckets in Pixeln (für Spawn- und Merge-Animationen)
+    MAX_TEXTS = 256    # Obergrenze für gecachte Texte (Punktzahl ändert sich laufend)
+
+    def __init__(self, config):
+        self.config = config
+        self._tiles = {}
+        self._texts = {}
+        self._overlays = {}
+        self._background = None
+        self._signature = None
+
+    def _make_signature(self):
+        c = self.config
+        return (c.CELL_SIZE, c.FONT_COLOR, c.BACKGROUND_COLOR, tuple(c.TILE_COLORS.items()), tuple(c.TEXT_COLORS.items()),
+                id(c.font), tuple(c.font.sizes.items()), id(c.tile_font), tuple(c.tile_font.sizes.items()))
+
+    def validate(self):
+        """
+        Leert den Cache, wenn sich Farben, Größen oder Fonts der Konfiguration geändert haben.
+        Gibt True zurück, wenn der Cache geleert wurde (alles muss neu gezeichnet werden).
+        """
+        signature = self._make_signature()
+        if signature != self._signature:
+            self.clear()
+            self._signature = signature
+            return True
+        return False
+
+    def clear(self):
+        self._tiles.clear()
+        self._texts.clear()
+        self._overlays.clear()
+        self._background = None
+
+    def background(self):
+        """Statischer Hintergrund: Fensterfarbe, leere Felder und Statistikleiste."""
+        if self._background is None:
+            c = self.config
+            surface = pygame.Surface(c.WINDOW_SIZE)
+            surface.fill(c.BACKGROUND_COLOR)
+            empty = self.tile(0)
+            step = c.CELL_SIZE + c.CELL_MARGIN
+            for i in range(c.GRID_SIZE):
+                for j in range(c.GRID_SIZE):
+                    surface.blit(empty, (c.GRID_PADDING + j * step, c.GRID_PADDING + i * step))
+            pygame.draw.rect(surface, (187, 173, 160), (0, c.WINDOW_HEIGHT - 50, c.WINDOW_WIDTH, 50))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            self._background = surface
+        return self._background
+
+    def font_for(self, value):
+        """Wähle Schriftgröße basierend auf Ziffernanzahl (skaliert mit der Zellgröße)."""
+        if value < 10:
+            return self.config.tile_font['large']
+        elif value < 100:
+            return self.config.tile_font['medium']
+        elif value < 1000:
+            return self.config.tile_font['small']
+        return self.config.tile_font['extra_small']
+
+    def bucket(self, size):
+        """Rundet eine Kachelgröße auf den nächsten Bucket."""
+        return max(0, int(round(size / self.SIZE_STEP)) * self.SIZE_STEP)
+
+    def tile(self, value, size=None):
+        """Liefert die Surface einer Kachel; `size` ist die (animierte) Kantenlänge in Pixeln."""
+        size = self.config.CELL_SIZE if size is None else self.bucket(size)
+        key = (value, size)
+        surface = self._tiles.get(key)
+        if surface is None:
+            surface = self._render_tile(value, size)
+            self._tiles[key] = surface
+        return surface
+
+    def _render_tile(self, value, size):
+        c = self.config
+        # Per-Pixel-Alpha: die abgerundeten Ecken bleiben auf jedem Untergrund durchsichtig
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.rect(surface, c.TILE_COLORS.get(value, c.TILE_COLORS[2048]), (0, 0, size, size), 0, 5)
+
+        # Text wie bei der Spawn-Animation: erst ab halber Größe sichtbar, dann mitwachsend
+        scale = size / c.CELL_SIZE
+        if value and scale >= 0.5:
+            text = self.font_for(value).render(str(value), True, c.TEXT_COLORS.get(value, c.FONT_COLOR))
+            text_scale = min(1.0, (scale - 0.5) * 2)
+            if text_scale < 1.0:
+                text = pygame.transform.scale(text, (int(text.get_width() * text_scale),
+                                                     int(text.get_height() * text_scale)))
+            if text_scale > 0:
+                surface.blit(text, text.get_rect(center=(size // 2, size // 2)))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()  # Pixelformat des Fensters übernehmen (mit Alpha)
+        return surface
+
+    def text(self, font_name, string, color):
+        """Gerenderter Text, gecacht nach (Font, Inhalt, Farbe)."""
+        key = (font_name, string, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) >= self.MAX_TEXTS:
+                self._texts.clear()
+            surface = self.config.font[font_name].render(string, True, color)
+            self._texts[key] = surface
+        return surface
+
+    def overlay(self, key, lines):
+        """
+        Halbtransparentes Vollbild-Overlay mit zentrierten Textzeilen (Win/Game Over).
+        lines: Liste von (Fontname, Text); gecacht, solange sich die Zeilen nicht ändern.
+        """
+        cached = self._overlays.get(key)
+        if cached is not None and cached[0] == lines:
+            return cached[1]
+
+        c = self.config
+        surface = pygame.Surface((c.WINDOW_WIDTH, c.WINDOW_HEIGHT), pygame.SRCALPHA)
+        surface.fill((255, 255, 255, 180))
+        for n, (font_name, string) in enumerate(lines):
+            text = c.font[font_name].render(string, True, (119, 110, 101))
+            surface.blit(text, (c.WINDOW_WIDTH // 2 - text.get_width() // 2,
+                                c.WINDOW_HEIGHT // 2 - text.get_height() // 2 + 60 * (n - 1)))
+        self._overlays[key] = (lines, surface)
+        return surface
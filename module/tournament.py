@@ -0,0 +1,194 @@
+import argparse
+import contextlib
+import csv
+import io
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from module.engine import Engine2048, auto_move_policy
+
+# Turnier zwischen Strategien: jede Strategie spielt dieselben geseedeten Partien headless auf
+# der Engine, verteilt in Paketen auf einen Prozesspool. Jedes beendete Spiel wird sofort als
+# Zeile ins CSV geschrieben, am Ende folgt eine Zusammenfassung pro Strategie:
+#   python -m module.tournament --strategies auto qtable ntuple --games 10000
+
+STRATEGIES = ("auto", "random", "qtable", "ntuple", "expectimax")
+CSV_FIELDS = ("strategy", "seed", "score", "best_tile", "moves", "seconds")
+TILE_GOALS = (2048, 4096, 8192, 16384)
+
+_players = {}  # Spieler pro Worker-Prozess, werden beim ersten Paket erstellt
+
+
+def _qtable_player(model_path):
+    """
+    Der ausgelieferte Agent (AI2048.choose_action) ohne Exploration – unbekannte Zustände also
+    wie im Spiel nach den Punkten des Zuges. Die Modelldatei wird nur lesend abgebildet.
+    """
+    from module.ai import AI2048
+    from module.modelstore import ModelFile, QTable
+    with contextlib.redirect_stdout(io.StringIO()):
+        ai = AI2048(load=False, exploration_rate=0.0, max_entries=None)
+    if os.path.exists(model_path):
+        ai.q_table = QTable(ModelFile(model_path, readonly=True), max_entries=None)
+    return lambda env, rng: ai.choose_action(env)
+
+
+def _ntuple_player():
+    from module.ntuple import NTupleAI
+    with contextlib.redirect_stdout(io.StringIO()):
+        ai = NTupleAI(exploration_rate=0.0)
+
+    def decide(env, rng):
+        best = ai.best_afterstate(env.board)
+        return best[0] if best else None
+    return decide
+
+
+def _expectimax_player(time_budget):
+    from module.expectimax import ExpectimaxAI
+    ai = ExpectimaxAI() if time_budget is None else ExpectimaxAI(time_budget=time_budget)
+    return lambda env, rng: ai.best_move(env.board)
+
+
+def _random_player(env, rng):
+    legal = env.legal_moves()
+    return rng.choice(legal) if legal else None
+
+
+def make_player(name, options):
+    """Erstellt die Entscheidungsfunktion decide(env, rng) -> Richtung oder None (env: Engine2048)."""
+    if name == "auto":
+        return lambda env, rng: auto_move_policy(env.board)
+    if name == "random":
+        return _random_player
+    if name == "qtable":
+        return _qtable_player(options["model_path"])
+    if name == "ntuple":
+        return _ntuple_player()
+    if name == "expectimax":
+        return _expectimax_player(options.get("time_budget"))
+    raise ValueError(f"Unbekannte Strategie: {name}")
+
+
+def play_game(decide, seed):
+    """Spielt eine Partie mit festem Seed. Gibt (Punkte, beste Kachel, Züge, Sekunden) zurück."""
+    start = time.perf_counter()
+    env = Engine2048(seed=seed)
+    rng = random.Random(seed * 2 + 1)  # Eigener Strom für Zufallsentscheidungen der Strategie
+    while not env.game_over:
+        direction = decide(env, rng)
+        if direction is None:
+            break
+        moved, _, _ = env.step(direction)
+        if not moved:  # Ungültiger Zug: durch einen zufälligen gültigen ersetzen
+            env.step(rng.choice(env.legal_moves()))
+    return env.score, env.best_tile, env.moves, time.perf_counter() - start
+
+
+def _play_chunk(name, seeds, options):
+    """Läuft im Worker: spielt alle Seeds eines Pakets und gibt die CSV-Zeilen zurück."""
+    decide = _players.get(name)
+    if decide is None:
+        decide = _players[name] = make_player(name, options)
+    return [(name, seed, *play_game(decide, seed)) for seed in seeds]
+
+
+class StrategyStats:
+    """Sammelt die Ergebnisse einer Strategie für die Zusammenfassung."""
+
+    def __init__(self):
+        self.scores = []
+        self.tiles = []
+        self.moves = 0
+        self.seconds = 0.0
+
+    def add(self, score, best_tile, moves, seconds):
+        self.scores.append(score)
+        self.tiles.append(best_tile)
+        self.moves += moves
+        self.seconds += seconds
+
+    def summary(self):
+        games = len(self.scores)
+        result = {
+            "games": games,
+            "mean_score": statistics.fmean(self.scores) if games else 0.0,
+            "median_score": statistics.median(self.scores) if games else 0.0,
+            "max_score": max(self.scores, default=0),
+            "moves_per_sec": self.moves / self.seconds if self.seconds else 0.0,
+        }
+        for goal in TILE_GOALS:
+            result[f"rate_{goal}"] = sum(tile >= goal for tile in self.tiles) / games if games else 0.0
+        return result
+
+
+def run_tournament(strategies, games, workers=None, seed=0, out="app_data/tournament.csv", chunk=50, options=None):
+    """
+    Lässt jede Strategie `games` Partien mit den Seeds seed .. seed + games - 1 spielen.
+    Schreibt jedes Spiel ins CSV, sobald sein Paket fertig ist, und gibt {Strategie: Zusammenfassung} zurück.
+    """
+    options = dict(options or {})
+    options.setdefault("model_path", "app_data/ai_model.bin")
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    stats = {name: StrategyStats() for name in strategies}
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    start = time.perf_counter()
+    last_report = start
+    done = 0
+    with open(out, "w", newline="") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        # Pakete abwechselnd pro Strategie einreichen, damit alle gleichmäßig vorankommen
+        futures = [pool.submit(_play_chunk, name, seeds[i:i + chunk], options)
+                   for i in range(0, games, chunk) for name in strategies]
+        for future in as_completed(futures):
+            rows = future.result()
+            for name, game_seed, score, best_tile, moves, seconds in rows:
+                writer.writerow((name, game_seed, score, best_tile, moves, f"{seconds:.4f}"))
+                stats[name].add(score, best_tile, moves, seconds)
+            f.flush()
+            done += len(rows)
+            now = time.perf_counter()
+            if now - last_report >= 5.0:
+                last_report = now
+                print(f"🏁 {done}/{games * len(strategies)} Spiele, {done / (now - start):.1f} Spiele/s")
+
+    print(f"💾 Ergebnisse gespeichert als {out} ({time.perf_counter() - start:.1f}s)")
+    return {name: s.summary() for name, s in stats.items()}
+
+
+def print_summary(summaries):
+    header = f"{'Strategie':<12} {'Spiele':>7} {'Ø Punkte':>10} {'Median':>9} {'Max':>8}" + \
+             "".join(f" {'≥' + str(goal):>7}" for goal in TILE_GOALS) + f" {'Züge/s':>9}"
+    print(header)
+    for name, s in summaries.items():
+        print(f"{name:<12} {s['games']:>7} {s['mean_score']:>10.0f} {s['median_score']:>9.0f} {s['max_score']:>8}" +
+              "".join(f" {s[f'rate_{goal}']:>7.1%}" for goal in TILE_GOALS) + f" {s['moves_per_sec']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turnier: Strategien spielen dieselben geseedeten Partien")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=["auto", "qtable"], help="Teilnehmende Strategien")
+    parser.add_argument("--games", type=int, default=1000, help="Spiele pro Strategie")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl der Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--seed", type=int, default=0, help="Erster Seed der Spielserie")
+    parser.add_argument("--chunk", type=int, default=50, help="Spiele pro Arbeitspaket")
+    parser.add_argument("--out", default="app_data/tournament.csv", help="CSV-Datei für die Einzelergebnisse")
+    parser.add_argument("--model", default="app_data/ai_model.bin", help="Modelldatei für die Strategie qtable")
+    parser.add_argument("--time-budget", type=float, default=None, help="Sekunden pro Expectimax-Zug")
+    args = parser.parse_args()
+
+    if "qtable" in args.strategies and not os.path.exists(args.model):
+        print(f"⚠️ Kein Modell unter {args.model} – qtable spielt in unbekannten Zuständen gierig nach Punkten")
+    summaries = run_tournament(args.strategies, args.games, workers=args.workers, seed=args.seed, out=args.out,
+                               chunk=args.chunk, options={"model_path": args.model, "time_budget": args.time_budget})
+    print_summary(summaries)
+
+
+if __name__ == "__main__":
+    main()
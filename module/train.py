@@ -0,0 +1,180 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from module.ai import AI2048
+from module.modelstore import ModelFile, QTable
+from module.engine import Engine2048
+
+# Paralleles Self-Play-Training: jeder Worker-Prozess spielt mit eigenem RNG-Strom
+# headless auf der Engine und liefert seine Q-Tabellen-Änderungen als Deltas gegenüber dem
+# Stand zu Beginn des Auftrags zurück. Nach jeweils sync_every Spielen pro Worker addiert der
+# Master alle Deltas auf; die neuen Master-Werte gehen mit den nächsten Aufträgen an die Worker,
+# sodass jede Runde vom gemeinsamen Stand aus weiterlernt.
+
+_worker_ai = None  # Lokales Modell des Worker-Prozesses
+_worker_round = 0  # Letzte Runde, deren Master-Änderungen dieser Worker übernommen hat
+
+
+def _init_worker(model_path, pending, params):
+    """
+    Initialisiert das lokale Modell eines Worker-Prozesses mit dem Stand des Masters:
+    die Modelldatei wird nur lesend abgebildet, ungespeicherte Änderungen kommen direkt mit.
+    """
+    global _worker_ai
+    _worker_ai = AI2048(load=False, **params)
+    model_file = ModelFile(model_path, readonly=True) if os.path.exists(model_path) else None
+    _worker_ai.q_table = QTable(model_file, max_entries=params.get('max_entries'), eviction=params.get('eviction', 'lru'))
+    for key, q_values in pending.items():
+        _worker_ai.q_table[key] = q_values
+
+
+def _sync_worker(log):
+    """Übernimmt die Master-Stände aller Runden aus `log`, die dieser Worker noch nicht gesehen hat."""
+    global _worker_round
+    for round_nr, changes in log:
+        if round_nr > _worker_round:
+            for key, q_values in changes.items():
+                _worker_ai.q_table[key] = q_values.copy()
+            _worker_round = round_nr
+
+
+def _self_play(games, seed, exploration_rate, log=()):
+    """
+    Gleicht das lokale Modell mit dem Master ab (`log`: [(Runde, {Schlüssel: Q-Werte})]) und
+    spielt `games` Partien. Gibt (Deltas der Q-Werte, Punktzahlen, beste Kachel, Explorationsrate,
+    Prozess-ID, übernommene Runde) zurück.
+    """
+    _sync_worker(log)
+    ai = _worker_ai
+    ai.exploration_rate = exploration_rate
+    # Getrennte Ströme für Zugwahl und Spawns, sonst liefen Exploration und neue Kacheln im Gleichschritt
+    policy_seed, engine_seed = np.random.SeedSequence(seed).generate_state(2).tolist()
+    random.seed(policy_seed)  # choose_action nutzt das random-Modul des Prozesses
+    env = Engine2048(seed=engine_seed)
+    bases = {}  # Q-Werte vor der ersten eigenen Änderung in diesem Auftrag
+    scores = []
+    best_tile = 0
+
+    for _ in range(games):
+        env.reset()
+        while not env.game_over:
+            old_state = ai.get_state(env.grid)
+            action = ai.choose_action(env)
+            moved, points, done = env.step(action)
+            if not moved:
+                # Ungültigen Zug durch einen zufälligen gültigen ersetzen, statt Schritte zu verschwenden
+                action = random.choice(env.legal_moves())
+                _, points, done = env.step(action)
+
+            key = old_state[0]  # Kanonischer Schlüssel
+            if key not in bases:
+                q_values = ai.q_table.get(key)
+                bases[key] = np.zeros(4) if q_values is None else q_values.copy()
+            ai.update_q_table(old_state, action, points, ai.get_state(env.grid), done)
+            ai.decay_exploration()
+
+        ai.end_episode()
+        scores.append(env.score)
+        best_tile = max(best_tile, env.best_tile)
+
+    deltas = {key: ai.q_table[key] - base for key, base in bases.items()}
+    return deltas, scores, best_tile, ai.exploration_rate, os.getpid(), _worker_round
+
+
+def merge_updates(ai, results):
+    """
+    Addiert die Deltas mehrerer Worker (alle vom selben Master-Stand aus gelernt) auf das Master-Modell.
+    Gibt die neuen Master-Werte {Schlüssel: Q-Werte} der geänderten Zustände zurück.
+    """
+    changes = {}
+    for deltas in results:
+        for state, delta in deltas.items():
+            q_values = changes.get(state)
+            if q_values is None:
+                q_values = ai.q_table.get(state)
+                q_values = np.zeros(4) if q_values is None else q_values.copy()
+            changes[state] = q_values + delta
+    for state, q_values in changes.items():
+        ai.q_table[state] = q_values
+    return changes
+
+
+def train_parallel(ai=None, games=1000, workers=None, sync_every=25, seed=None):
+    """
+    Trainiert `ai` mit `games` Self-Play-Partien, verteilt auf `workers` Prozesse.
+    Nach jeweils `sync_every` Spielen pro Worker werden die Änderungen zusammengeführt und
+    mit der nächsten Runde an alle Worker verteilt.
+    """
+    ai = ai if ai is not None else AI2048()
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed)
+    params = {
+        'learning_rate': ai.learning_rate,
+        'discount_factor': ai.discount_factor,
+        'exploration_decay': ai.exploration_decay,
+        'max_entries': ai.max_entries,
+        'eviction': ai.eviction,
+    }
+
+    remaining = games
+    log = []     # [(Runde, Änderungen)], die noch nicht jeder Worker-Prozess übernommen hat
+    synced = {}  # Prozess-ID -> zuletzt übernommene Runde
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ai.model_path, ai.q_table.pending(), params)) as pool:
+        round_nr = 0
+        while remaining > 0:
+            futures = []
+            for child in seeds.spawn(workers):
+                count = min(sync_every, remaining)
+                if count <= 0:
+                    break
+                remaining -= count
+                task_seed = int(child.generate_state(1)[0])
+                futures.append(pool.submit(_self_play, count, task_seed, ai.exploration_rate, log))
+
+            results = [future.result() for future in futures]
+            changes = merge_updates(ai, [r[0] for r in results])
+            merged = len(changes)
+
+            for _, scores, best_tile, _, pid, worker_round in results:
+                ai.games_played += len(scores)
+                ai.best_score = max(ai.best_score, max(scores))
+                ai.best_tile = max(ai.best_tile, best_tile)
+                synced[pid] = max(synced.get(pid, 0), worker_round)
+            ai.exploration_rate = float(np.mean([r[3] for r in results]))
+
+            round_nr += 1
+            log.append((round_nr, changes))
+            # Welcher Prozess einen Auftrag bekommt, entscheidet der Pool – daher alles mitschicken,
+            # was der am weitesten zurückliegende Worker noch nicht übernommen hat
+            oldest = min(synced.values()) if len(synced) >= workers else 0
+            log = [entry for entry in log if entry[0] > oldest]
+            played = games - remaining
+            elapsed = time.perf_counter() - start
+            print(f"🔁 Runde {round_nr}: {played}/{games} Spiele, {merged} Zustände gemischt, "
+                  f"{played / elapsed:.1f} Spiele/s")
+
+    ai.save_model()
+    return ai
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paralleles Self-Play-Training für AI2048")
+    parser.add_argument("--games", type=int, default=1000, help="Anzahl der Trainingsspiele")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl der Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--sync-every", type=int, default=25, help="Spiele pro Worker zwischen zwei Merges")
+    parser.add_argument("--seed", type=int, default=None, help="Startwert für die RNG-Ströme")
+    parser.add_argument("--max-entries", type=int, default=500000, help="Obergrenze der Q-Tabelle im Arbeitsspeicher")
+    parser.add_argument("--eviction", choices=("lru", "visits"), default="lru", help="Verdrängungsstrategie")
+    args = parser.parse_args()
+    ai = AI2048(max_entries=args.max_entries, eviction=args.eviction)
+    train_parallel(ai=ai, games=args.games, workers=args.workers, sync_every=args.sync_every, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+from module import bitboard
+
+# Zeilentabellen des Bitboards als NumPy-Arrays für die gebündelte Verarbeitung
+_LEFT = np.array(bitboard.ROW_LEFT, dtype=np.uint16)
+_RIGHT = np.array(bitboard.ROW_RIGHT, dtype=np.uint16)
+_SCORE = np.array(bitboard.ROW_SCORE, dtype=np.int64)
+_SHIFTS = np.array([0, 4, 8, 12], dtype=np.uint16)
+_BOARD_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def _move_boards(boards, actions):
+    """
+    Wendet je Brett eine Aktion an (ohne Spawn).
+    boards: (N, 4, 4) uint8 Exponenten, actions: (N,) mit 0=Up, 1=Right, 2=Down, 3=Left
+    Gibt (neue Bretter, Punkte, moved) zurück.
+    """
+    wide = boards.astype(np.uint16)
+    row_keys = (wide << _SHIFTS).sum(axis=2, dtype=np.uint16)            # (N, 4) Zeilen
+    col_keys = (wide << _SHIFTS[:, None]).sum(axis=1, dtype=np.uint16)   # (N, 4) Spalten
+
+    horizontal = (actions & 1).astype(bool)
+    towards_start = (actions == 0) | (actions == 3)  # Up/Left nutzen die Links-Tabelle
+    keys = np.where(horizontal[:, None], row_keys, col_keys)
+    new_keys = np.where(towards_start[:, None], _LEFT[keys], _RIGHT[keys])
+    points = _SCORE[keys].sum(axis=1)
+
+    lines = ((new_keys[..., None] >> _SHIFTS) & 0xF).astype(np.uint8)   # (N, Linie, Zelle)
+    new_boards = np.where(horizontal[:, None, None], lines, lines.transpose(0, 2, 1))
+    moved = (new_boards != boards).any(axis=(1, 2))
+    return new_boards, np.where(moved, points, 0), moved
+
+
+def _game_over(boards):
+    """Erkennt für jedes Brett, ob kein Zug mehr möglich ist."""
+    empty = (boards == 0).any(axis=(1, 2))
+    # 32768er (Exponent 15) lassen sich im Bitboard nicht zusammenfassen
+    horizontal = ((boards[:, :, :-1] == boards[:, :, 1:]) & (boards[:, :, 1:] < bitboard.MAX_EXPONENT)).any(axis=(1, 2))
+    vertical = ((boards[:, :-1, :] == boards[:, 1:, :]) & (boards[:, 1:, :] < bitboard.MAX_EXPONENT)).any(axis=(1, 2))
+    return ~(empty | horizontal | vertical)
+
+
+class VecEnv2048:
+    """
+    Führt N Spiele gleichzeitig aus. Die Bretter liegen als (N, 4, 4) uint8-Array
+    mit log2-Exponenten vor; Züge, Spawns, Belohnungen und Spielende laufen
+    komplett über NumPy, beendete Spiele werden automatisch neu gestartet.
+    """
+
+    def __init__(self, num_envs, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((num_envs, 4, 4), dtype=np.uint8)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+        self.moves = np.zeros(num_envs, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Setzt alle (oder die per Maske gewählten) Bretter auf einen Startzustand mit zwei Kacheln."""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.boards[mask] = 0
+        self.scores[mask] = 0
+        self.moves[mask] = 0
+        self._spawn(mask)
+        self._spawn(mask)
+        return self.boards
+
+    def _spawn(self, mask):
+        """Setzt auf jedem gewählten Brett eine 2 (90%) oder 4 (10%) auf eine zufällige leere Zelle."""
+        idx = np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        flat = self.boards.reshape(self.num_envs, 16)
+        empty = flat[idx] == 0
+        # Zufallswert je Zelle, belegte Zellen ausmaskiert: argmax wählt gleichverteilt eine leere Zelle
+        keys = np.where(empty, self.rng.random((idx.size, 16)), -1.0)
+        positions = keys.argmax(axis=1)
+        values = np.where(self.rng.random(idx.size) < 0.9, 1, 2).astype(np.uint8)
+        has_empty = empty.any(axis=1)
+        flat[idx[has_empty], positions[has_empty]] = values[has_empty]
+
+    def legal_actions(self):
+        """Gibt eine (N, 4)-Maske der Aktionen zurück, die das jeweilige Brett verändern."""
+        legal = np.empty((self.num_envs, 4), dtype=bool)
+        for action in range(4):
+            actions = np.full(self.num_envs, action, dtype=np.int64)
+            legal[:, action] = _move_boards(self.boards, actions)[2]
+        return legal
+
+    def step(self, actions):
+        """
+        Führt je Brett eine Aktion inklusive Spawn aus.
+        Ungültige Züge lassen das Brett unverändert und geben Belohnung 0.
+        Gibt (Bretter, Belohnungen, dones, info) zurück; info enthält Endpunktzahl
+        und höchste Kachel der in diesem Schritt beendeten (und neu gestarteten) Spiele.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        new_boards, rewards, moved = _move_boards(self.boards, actions)
+        self.boards = new_boards
+        self._spawn(moved)
+        self.scores += rewards
+        self.moves += moved
+
+        dones = _game_over(self.boards)
+        info = {"moved": moved}
+        if dones.any():
+            info["final_scores"] = self.scores[dones].copy()
+            info["final_max_tiles"] = 1 << self.boards[dones].max(axis=(1, 2)).astype(np.int64)
+            info["final_moves"] = self.moves[dones].copy()
+            self.reset(dones)
+        return self.boards, rewards, dones, info
+
+    def to_bitboards(self):
+        """Packt alle Bretter in uint64-Bitboards (Layout wie module.bitboard)."""
+        flat = self.boards.reshape(self.num_envs, 16).astype(np.uint64)
+        return np.bitwise_or.reduce(flat << _BOARD_SHIFTS, axis=1)
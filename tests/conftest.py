@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Die Module liegen ohne Paket-Setup in module/ – Projektwurzel für die Imports voranstellen
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # pygame-Tests ohne Fenster
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Eigenes Arbeitsverzeichnis (app_data, Highscore); verzögerte Schreibvorgänge landen noch darin."""
+    from module import persistence
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    persistence.store.flush()
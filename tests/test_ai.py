@@ -0,0 +1,20 @@
+import pickle
+
+import numpy as np
+
+from module import bitboard
+from module.ai import AI2048
+
+
+def test_import_pickle_skips_boards_beyond_the_bitboard(workdir):
+    small = ((2, 0, 0, 0), (0, 4, 0, 0), (0, 0, 0, 0), (0, 0, 0, 8))
+    huge = ((65536, 0, 0, 0), (0, 4, 0, 0), (0, 0, 0, 0), (0, 0, 0, 8))
+    with open("old.pkl", "wb") as f:
+        pickle.dump({small: [1.0, 2.0, 3.0, 4.0], huge: [5.0, 6.0, 7.0, 8.0]}, f)
+
+    ai = AI2048(load=False)
+    ai._import_pickle("old.pkl")
+    assert len(ai.q_table) == 1
+    key, sym = bitboard.canonical(bitboard.from_grid(small))
+    q_values = ai.q_table[key]
+    assert np.array_equal(q_values[list(bitboard.ACTION_TO_CANON[sym])], [1.0, 2.0, 3.0, 4.0])
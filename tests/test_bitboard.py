@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from module import bitboard, engine
+from module.ai import AI2048
+
+
+def _values(row):
+    return [1 << ((row >> (4 * j)) & 0xF) if (row >> (4 * j)) & 0xF else 0 for j in range(4)]
+
+
+def test_row_tables_match_process_line():
+    """Jede darstellbare Zeile unterhalb von 32768 bewegt sich wie in der Listen-Engine."""
+    checked = 0
+    for row in range(65536):
+        values = _values(row)
+        if not bitboard.fits([values]):
+            continue
+        left, points = engine.process_line(values)
+        assert _values(bitboard.ROW_LEFT[row]) == left
+        assert bitboard.ROW_SCORE[row] == points
+        right, _ = engine.process_line(values[::-1])
+        assert _values(bitboard.ROW_RIGHT[row]) == right[::-1]
+        checked += 1
+    assert checked == 15 ** 4
+
+
+def test_moves_match_move_grid():
+    rng = random.Random(7)
+    for _ in range(2000):
+        grid = [[rng.choice((0, 0, 2, 4, 8, 16, 1024, 16384)) for _ in range(4)] for _ in range(4)]
+        board = bitboard.from_grid(grid)
+        for direction, (after, points) in enumerate(bitboard.all_moves(board)):
+            new_grid, expected_points, _ = engine.move_grid(grid, direction)
+            assert bitboard.to_grid(after) == new_grid
+            assert points == expected_points
+
+
+def test_fits_excludes_tiles_beyond_the_nibble():
+    assert bitboard.fits([[16384, 2, 0, 0]])
+    assert not bitboard.fits([[32768, 32768, 0, 0]])
+    with pytest.raises(ValueError):
+        bitboard.from_grid([[65536, 0, 0, 0], [0] * 4, [0] * 4, [0] * 4])
+
+
+def test_large_tiles_fall_back_to_list_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    grid = [[32768, 32768, 0, 0], [65536, 2, 0, 0], [0] * 4, [0] * 4]
+    assert engine.move_grid(grid, 3)[0][0] == [65536, 0, 0, 0]  # Zwei 32768er verschmelzen wie im Spiel
+    ai = AI2048(load=False, exploration_rate=0.0)
+    ai.get_state(grid)  # Kein ValueError: Schlüssel über bigboard
+
+    class Snapshot:
+        pass
+    snapshot = Snapshot()
+    snapshot.grid = grid
+    new_grid, points, moved = engine.afterstates(grid)[ai.choose_action(snapshot)]
+    assert moved and points == 65536  # Gierig: die beiden 32768er verschmelzen
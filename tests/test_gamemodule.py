@@ -0,0 +1,63 @@
+from module import bitboard
+from module.Gamemodule import Game2048
+from module.ntuple import NTupleAI
+
+
+class RecordingAI:
+    """Wählt den ersten gültigen Zug und merkt sich, auf welchem Brett entschieden und gelernt wurde."""
+
+    def __init__(self):
+        self.decisions = []
+        self.updates = []
+
+    def get_state(self, grid):
+        return [row[:] for row in grid]
+
+    def choose_action(self, game):
+        assert not game.moving and game.merge_phase == 0  # Spawn des letzten Zuges ist gesetzt
+        self.decisions.append([row[:] for row in game.grid])
+        return next(d for d, (_, _, moved) in enumerate(game.afterstates()) if moved)
+
+    def update_q_table(self, old_state, action, reward, new_state, done=False, afterstate=None):
+        self.updates.append(old_state)
+
+    def decay_exploration(self):
+        pass
+
+
+def test_animated_ai_decides_on_the_settled_board(workdir):
+    game = Game2048()
+    game.ai = ai = RecordingAI()
+    merging = 0
+    for _ in range(300):
+        if game.game_over:
+            break
+        game.auto_ai_move()
+        game.update(game.config.MOVE_ANIMATION_DURATION)  # Bewegung fertig, Merge-Animation läuft evtl. noch
+        merging += game.merge_phase > 0
+    assert merging > 0  # Der nächste Zug wurde also mehrfach mitten in der Merge-Animation angefordert
+    assert ai.updates == ai.decisions  # Jeder gewählte Zug wurde auch ausgeführt
+
+
+def test_animated_ntuple_learns_the_afterstate_the_game_produced(workdir):
+    game = Game2048()
+    game.ai = ai = NTupleAI(load=False, exploration_rate=0.2)
+    checked = 0
+    for _ in range(300):
+        if game.game_over:
+            break
+        game.auto_ai_move()
+        if game.moving:  # Ziel der Bewegungsanimation = Afterstate, auf dem der nächste TD-Schritt aufbaut
+            assert ai._last_afterstate == bitboard.from_grid(game.new_grid)
+            checked += 1
+        game.update(game.config.MOVE_ANIMATION_DURATION)
+    assert checked > 20
+
+
+def test_sync_board_after_replacing_the_grid(workdir):
+    game = Game2048()
+    game.grid = [[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 1024]]
+    game.sync_board()
+    assert game.empty_mask == 0 and game.best_tile == 1024
+    assert game.is_game_over()
+    assert not any(moved for _, _, moved in game.afterstates())
@@ -0,0 +1,164 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from module.modelstore import ModelFile, QTable
+
+
+def _q(value):
+    return np.full(4, float(value))
+
+
+@pytest.mark.parametrize("eviction", ["lru", "visits"])
+def test_memory_limit_is_kept(eviction):
+    table = QTable(max_entries=8, eviction=eviction)
+    for key in range(100):
+        table[key] = _q(key)
+    assert len(table.entries) == 8
+    assert table.evictions == 92
+
+
+def test_lru_evicts_least_recently_used():
+    table = QTable(max_entries=3, eviction="lru")
+    for key in (1, 2, 3):
+        table[key] = _q(key)
+    table.get(1)  # 1 ist jetzt der jüngste Zugriff
+    table[4] = _q(4)
+    assert set(table.entries) == {1, 3, 4}
+
+
+def test_visits_evicts_least_visited_even_if_old():
+    table = QTable(max_entries=20, eviction="visits")
+    for key in range(20):
+        table[key] = _q(key)
+        for _ in range(10 if key < 16 else 1):  # Die ältesten Einträge sind die meistbesuchten
+            table.get(key)
+    for key in range(20, 30):
+        table[key] = _q(key)
+        table.get(key)
+    assert set(range(16)) <= set(table.entries)
+    assert min(table.visits[key] for key in table.entries) >= 2
+
+
+def test_visits_keeps_the_new_entry():
+    table = QTable(max_entries=2, eviction="visits")
+    table[1] = _q(1)
+    table[2] = _q(2)
+    table.get(1)
+    table.get(2)
+    table[3] = _q(3)  # Hat 0 Besuche, darf aber nicht sofort wieder verdrängt werden
+    assert 3 in table.entries and len(table.entries) == 2
+
+
+def _file_backed_table(tmp_path, max_entries):
+    model = ModelFile(str(tmp_path / "model.bin"))
+    model.write({key: _q(key) for key in range(0, 200, 2)})  # Nur gerade Schlüssel stehen in der Datei
+    model.compact()
+    model.write({301: _q(301)})  # Ein Eintrag im unsortierten Anhang
+    return QTable(model, max_entries=max_entries)
+
+
+def test_gather_and_scatter_match_single_access(tmp_path):
+    keys = np.array([0, 1, 2, 2, 150, 151, 301, 7, 0], dtype=np.uint64)
+    batched = _file_backed_table(tmp_path / "a", max_entries=5)
+    single = _file_backed_table(tmp_path / "b", max_entries=5)
+
+    out = batched.gather(keys, np.empty((len(keys), 4)))
+    expected = np.array([single.get(key, np.zeros(4)) for key in keys.tolist()])
+    assert np.array_equal(out, expected)
+
+    values = out + 1.0
+    batched.scatter(keys, values)
+    for key, row in zip(keys.tolist(), values):
+        single[key] = row.copy()
+    for key in set(keys.tolist()):
+        assert np.array_equal(batched.get(key), single.get(key))
+    assert len(batched) == len(single)
+
+
+def test_model_file_round_trip(tmp_path):
+    path = str(tmp_path / "app_data" / "model.bin")
+    ModelFile(path).write({5: _q(5), 1: _q(1)}, stats={"games_played": 7})
+    model = ModelFile(path)
+    assert len(model) == 2 and model.stats["games_played"] == 7
+    assert np.array_equal(model.get(5), _q(5))
+    assert model.get(2) is None
+
+
+def test_tail_is_found_and_updated_in_place(tmp_path):
+    model = ModelFile(str(tmp_path / "model.bin"))
+    model.write({key: _q(key) for key in (4, 2, 6)})
+    model.compact()
+    model.write({3: _q(3)})  # Neu: landet im Anhang
+    model.write({3: _q(30), 4: _q(40)})  # Bekannt: an Ort und Stelle
+    assert (model.sorted_count, model.count) == (3, 4)
+    assert ModelFile(model.path)._tail_index is None  # Öffnen baut keinen Index über den Anhang
+    found, q_values = model.get_many([3, 4, 5])
+    assert found.tolist() == [True, True, False]
+    assert np.array_equal(q_values[:2], [_q(30), _q(40)])
+
+
+def test_compact_sorts_and_keeps_values(tmp_path):
+    path = str(tmp_path / "model.bin")
+    model = ModelFile(path)
+    for key in (9, 3, 7, 1):
+        model.write({key: _q(key)})
+    model.compact()
+    assert model.sorted_count == model.count == 4
+    assert not os.path.exists(path + ".tmp")
+    reopened = ModelFile(path)
+    assert reopened.sorted_count == 4
+    assert np.array_equal(reopened.get_many([1, 3, 7, 9])[1], [_q(1), _q(3), _q(7), _q(9)])
+
+
+def test_writes_during_compaction_are_kept(tmp_path, monkeypatch):
+    model = ModelFile(str(tmp_path / "model.bin"))
+    model.write({key: _q(key) for key in (2, 1)})
+    argsort = np.argsort
+    started = []
+
+    def write_meanwhile(*args, **kwargs):
+        # Läuft, während die neue Datei entsteht: darf nicht an der Sperre hängen bleiben
+        if not started:
+            started.append(True)
+            writer = threading.Thread(target=model.write, args=({1: _q(10), 5: _q(5)},))
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive()
+        return argsort(*args, **kwargs)
+
+    monkeypatch.setattr(np, "argsort", write_meanwhile)
+    model.compact()
+    monkeypatch.undo()
+    assert np.array_equal(model.get(1), _q(10))
+    assert np.array_equal(model.get(5), _q(5))
+    assert np.array_equal(model.get(2), _q(2))
+
+
+class HeldWriter:
+    """Sammelt Schreibaufträge, statt sie auszuführen (wie ein noch beschäftigter Hintergrund-Thread)."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, func, *args):
+        self.jobs.append((func, args))
+
+    def run(self):
+        for func, args in self.jobs:
+            func(*args)
+        self.jobs = []
+
+
+def test_evicted_entries_go_through_the_writer(tmp_path):
+    path = str(tmp_path / "model.bin")
+    writer = HeldWriter()
+    table = QTable(path=path, max_entries=10, writer=writer)
+    for key in range(5000):
+        table[key] = _q(key)
+    assert writer.jobs and not os.path.exists(path)  # Nichts im aufrufenden Thread geschrieben
+    assert np.array_equal(table.get(3), _q(3))  # Unterwegs befindliche Einträge bleiben lesbar
+    writer.run()
+    assert np.array_equal(ModelFile(path).get(5), _q(5))
@@ -0,0 +1,36 @@
+import os
+
+from module.persistence import WriteBehind, write_atomic
+
+
+def test_write_atomic_replaces_without_leftovers(tmp_path):
+    path = str(tmp_path / "app_data" / "high_score.txt")
+    write_atomic(path, "10")
+    write_atomic(path, "20")
+    assert open(path).read() == "20"
+    assert os.listdir(tmp_path / "app_data") == ["high_score.txt"]
+
+
+def test_pending_changes_are_read_and_coalesced(tmp_path):
+    store = WriteBehind(delay=60)
+    path = str(tmp_path / "score.txt")
+    store.put(path, "1")
+    store.put(path, "2")
+    assert store.read(path) == "2"
+    assert not os.path.exists(path)  # Noch nicht geschrieben
+    store.close()
+    assert open(path).read() == "2"
+
+
+def test_flush_after_chdir_writes_to_the_original_place(tmp_path, monkeypatch):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    store = WriteBehind(delay=60)
+    monkeypatch.chdir(first)
+    store.put("app_data/high_score.txt", "42")
+    monkeypatch.chdir(second)
+    assert store.read(str(first / "app_data" / "high_score.txt")) == "42"
+    store.close()
+    assert (first / "app_data" / "high_score.txt").read_text() == "42"
+    assert not (second / "app_data").exists()
@@ -0,0 +1,26 @@
+from module.engine import afterstates
+from module.expectimax import ExpectimaxAI
+from module.montecarlo import MonteCarloAI
+
+BIG_TILES = [[65536, 65536, 0, 0], [2, 4, 8, 16], [0] * 4, [0] * 4]
+
+
+class _Snapshot:
+    def __init__(self, grid):
+        self.grid = grid
+
+
+def _points(grid, direction):
+    return afterstates(grid)[direction][1]
+
+
+def test_expectimax_handles_tiles_beyond_the_bitboard():
+    direction = ExpectimaxAI(time_budget=0.01).choose_action(_Snapshot(BIG_TILES))
+    assert _points(BIG_TILES, direction) == 131072
+
+
+def test_montecarlo_handles_tiles_beyond_the_bitboard():
+    player = MonteCarloAI(time_budget=0.01, workers=1)
+    direction = player.choose_action(_Snapshot(BIG_TILES))  # Ohne Rollouts, der Pool startet nicht
+    player.close()
+    assert _points(BIG_TILES, direction) == 131072
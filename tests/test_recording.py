@@ -0,0 +1,64 @@
+import random
+
+from module import bitboard
+from module.Gamemodule import Game2048
+from module.recording import (GameRecorder, RecordingWriter, apply_step, final_state, pack_step,
+                              read_games, unpack_step)
+
+
+def test_step_bytes_round_trip():
+    for direction in range(4):
+        for pos in range(16):
+            for value in (2, 4):
+                assert unpack_step(pack_step(direction, pos, value)) == (direction, pos, value)
+
+
+def _play(game, rng, moves):
+    for _ in range(moves):
+        if game.game_over:
+            break
+        game.move(rng.randrange(4), instant=True)
+
+
+def test_recorded_games_replay_to_the_same_final_state(workdir):
+    path = str(workdir / "games.rec")
+    writer = RecordingWriter(path)
+    rng = random.Random(3)
+    played = []
+    game = Game2048(recorder=GameRecorder(writer))
+    for n in range(3):
+        if n:
+            game.reset_game()  # Beendet das vorige Spiel in der Aufzeichnung
+        _play(game, rng, 200)
+        played.append(([row[:] for row in game.grid], game.score, game.total_moves))
+    game.recorder.end_game()
+    writer.close()
+
+    games = list(read_games(path))
+    assert len(games) == 3
+    moves_before = 0
+    for recorded, (grid, score, total_moves) in zip(games, played):
+        assert len(recorded) == total_moves - moves_before
+        moves_before = total_moves
+        board, recorded_score, best_tile = final_state(recorded)
+        assert bitboard.to_grid(board) == grid
+        assert recorded_score == score
+        assert best_tile == max(max(row) for row in grid)
+
+        view = Game2048()
+        view.reset_game(forced_spawns=list(recorded.initial))
+        for byte in recorded.moves:
+            assert apply_step(view, byte, instant=True)
+        assert view.grid == grid
+        assert view.score == score
+
+
+def test_replay_continues_after_2048(workdir):
+    view = Game2048()
+    view.reset_game(forced_spawns=[(0, 2), (15, 2)])
+    view.grid = [[1024, 1024, 0, 0], [0] * 4, [0] * 4, [0] * 4]
+    view.sync_board()
+    assert apply_step(view, pack_step(3, 15, 2), instant=True)  # Links: 2048 entsteht
+    assert view.game_won
+    assert apply_step(view, pack_step(2, 0, 2), instant=True)  # Weiter wie in der Aufzeichnung
+    assert view.grid[3][0] == 2048
@@ -0,0 +1,17 @@
+import pygame
+
+from module.const import GameConfig
+from module.tilecache import TileCache
+
+
+def test_tile_corners_are_transparent():
+    pygame.display.init()
+    try:
+        pygame.display.set_mode((64, 64))
+        config = GameConfig()
+        tile = TileCache(config).tile(0)
+        assert tile.get_at((0, 0)).a == 0  # Abgerundete Ecke
+        center = config.CELL_SIZE // 2
+        assert tile.get_at((center, center)) == pygame.Color(*config.TILE_COLORS[0])
+    finally:
+        pygame.display.quit()
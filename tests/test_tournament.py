@@ -0,0 +1,32 @@
+import random
+
+import numpy as np
+
+from module import bitboard
+from module.ai import AI2048
+from module.engine import Engine2048
+from module.modelstore import ModelFile
+from module.tournament import make_player, play_game
+
+
+def test_qtable_player_follows_the_model(tmp_path):
+    env = Engine2048(seed=3)
+    direction = env.legal_moves()[-1]
+    key, sym = bitboard.canonical(env.board)
+    q_values = np.zeros(4)
+    q_values[bitboard.ACTION_TO_CANON[sym][direction]] = 1.0  # Q-Werte liegen in kanonischer Richtung
+    model_path = str(tmp_path / "model.bin")
+    ModelFile(model_path).write({key: q_values})
+
+    decide = make_player("qtable", {"model_path": model_path})
+    assert decide(env, random.Random(0)) == direction
+
+
+def test_qtable_player_matches_the_shipped_agent(workdir):
+    decide = make_player("qtable", {"model_path": str(workdir / "missing.bin")})
+    agent = AI2048(load=False, exploration_rate=0.0)
+    env = Engine2048(seed=5)
+    for _ in range(50):
+        assert decide(env, random.Random(0)) == agent.choose_action(env)
+        env.step(agent.choose_action(env))
+    assert play_game(decide, seed=5)[0] > 0
@@ -0,0 +1,20 @@
+import random
+
+from module import train
+from module.engine import Engine2048
+
+
+def test_workers_keep_the_eviction_policy(workdir):
+    train._init_worker(str(workdir / "missing.bin"), {}, {"max_entries": 10, "eviction": "visits"})
+    assert train._worker_ai.q_table.eviction == "visits"
+    assert train._worker_ai.eviction == "visits"
+
+
+def test_policy_and_spawns_use_separate_streams(workdir, monkeypatch):
+    seeds = []
+    monkeypatch.setattr(train, "Engine2048", lambda seed: seeds.append(seed) or Engine2048(seed=seed))
+    monkeypatch.setattr(random, "seed", lambda seed: seeds.append(seed))
+    train._init_worker(str(workdir / "missing.bin"), {}, {"max_entries": None})
+    train._self_play(1, 7, 0.5)
+    policy_seed, engine_seed = seeds
+    assert policy_seed != engine_seed and 7 not in seeds